@@ -0,0 +1,112 @@
+import math
+import time
+from itertools import chain
+from operator import attrgetter
+
+from config import AI_BUDGET_MS
+from utils import get_numpy
+
+NUMPY_MIN_AGENTS = 16  # below this, building the arrays costs more than the loop
+ALIGNED = 0.5  # degrees off the target heading that count as facing it
+
+STEERING_STATE = attrgetter('x', 'y', 'angle')
+TARGET = attrgetter('target')
+
+
+def heading_error(angle, x, y, target_x, target_y):
+    # degrees to turn to face the target, in -180..180, with the y axis pointing down like utils.direction_vector
+    desired = math.degrees(math.atan2(y - target_y, target_x - x))
+    return (desired - angle + 180) % 360 - 180
+
+
+class AIScheduler:
+    """
+    Spreads AI decisions of many agents across frames
+
+    Agents are visited round-robin, every frame continues where the last one stopped
+    and stops once the millisecond budget is used up. Agents far from the focus (the player)
+    are due less often, so the cost per frame stays flat as waves grow.
+    Steering towards each agent's target is applied every frame in one batch
+
+    An agent has x, y, angle, alive, a target point (or None) and a use_ai() method
+    """
+
+    # (distance to the focus up to, seconds between decisions)
+    LOD_INTERVALS = ((150, 0.1), (400, 0.3), (math.inf, 0.75))
+
+    def __init__(self, budget_ms=AI_BUDGET_MS, turn_rate=180):
+        self.budget = budget_ms / 1000
+        self.turn_rate = turn_rate  # degrees per second
+        self.agents = []
+        self.time = 0.0
+        self._cursor = 0
+        # per frame counters
+        self.decisions = 0
+        self.deferred = 0  # agents that were due but left for the next frame
+
+    def add(self, agent):
+        agent._ai_due = self.time
+        self.agents.append(agent)
+
+    def clear(self):
+        self.agents.clear()
+        self._cursor = 0
+
+    def interval(self, distance):
+        for max_distance, interval in self.LOD_INTERVALS:
+            if distance <= max_distance:
+                return interval
+        return self.LOD_INTERVALS[-1][1]
+
+    def update(self, dt, focus=None):
+        self.time += dt
+        if any(not i.alive for i in self.agents):
+            self.agents = [i for i in self.agents if i.alive]
+        self.think(focus)
+        self.steer(dt)
+
+    def think(self, focus=None):
+        agents, now = self.agents, self.time
+        count = len(agents)
+        decisions = deferred = 0
+        if count:
+            start = time.perf_counter()
+            cursor = self._cursor % count
+            for step in range(count):
+                agent = agents[(cursor + step) % count]
+                if agent._ai_due > now:
+                    continue
+                if time.perf_counter() - start > self.budget:
+                    self._cursor = (cursor + step) % count
+                    deferred = sum(1 for i in range(step, count) if agents[(cursor + i) % count]._ai_due <= now)
+                    break
+                agent.use_ai()
+                distance = math.hypot(agent.x - focus.x, agent.y - focus.y) if focus is not None else 0
+                agent._ai_due = now + self.interval(distance)
+                decisions += 1
+            else:
+                self._cursor = cursor
+        self.decisions, self.deferred = decisions, deferred
+
+    def steer(self, dt):
+        steering = [i for i in self.agents if i.target is not None]
+        if not steering:
+            return
+        max_turn = self.turn_rate * dt
+        np = get_numpy() if len(steering) >= NUMPY_MIN_AGENTS else None
+        if np is None:  # plain loop for small batches or without numpy
+            for agent in steering:
+                diff = heading_error(agent.angle, agent.x, agent.y, *agent.target)
+                if abs(diff) > ALIGNED:
+                    agent.angle = (agent.angle + max(-max_turn, min(diff, max_turn))) % 360
+            return
+        count = len(steering)
+        state = np.fromiter(chain.from_iterable(map(STEERING_STATE, steering)), float, count * 3).reshape(count, 3)
+        target = np.fromiter(chain.from_iterable(map(TARGET, steering)), float, count * 2).reshape(count, 2)
+        x, y, angle = state[:, 0], state[:, 1], state[:, 2]
+        desired = np.degrees(np.arctan2(y - target[:, 1], target[:, 0] - x))
+        diff = (desired - angle + 180) % 360 - 180
+        angles = ((angle + np.clip(diff, -max_turn, max_turn)) % 360).tolist()
+        # only agents that are not already facing their target get a new angle
+        for index in np.flatnonzero(np.abs(diff) > ALIGNED).tolist():
+            steering[index].angle = angles[index]
@@ -0,0 +1,34 @@
+class AnimationClock:
+    """
+    Global frame clock for sprite animations
+
+    The clock is advanced once per frame by the game loop, frame indices are computed
+    once per frame for every (frame count, frame duration, phase) group and shared by
+    all sprites in that group, so drawing a sprite is just a lookup
+    """
+
+    def __init__(self):
+        self.time = 0.0
+        self.frame = 0  # number of ticks so far
+        self._indices: dict[tuple[int, float, int], int] = {}
+
+    def tick(self, dt):
+        self.time += dt
+        self.frame += 1
+        self._indices.clear()
+
+    def reset(self):
+        self.time = 0.0
+        self.frame = 0
+        self._indices.clear()
+
+    def index(self, frames, duration, phase=0):
+        key = (frames, duration, phase)
+        try:
+            return self._indices[key]
+        except KeyError:
+            index = self._indices[key] = (int(self.time / duration) + phase) % frames if duration > 0 else phase % frames
+            return index
+
+
+ANIMATIONS = AnimationClock()
@@ -0,0 +1,157 @@
+"""
+Persistent cache of decoded and scaled images
+
+Pixel data is stored raw in a single file so later launches skip png decoding and scaling:
+
+    MAGIC | index offset (8 bytes, little endian) | pixel data ... | json index
+
+The index is a list of [key, entry] pairs, a key is the source path followed by the load parameters
+and its entry holds the source mtime and size, the image size, pixel format and where its bytes live in the file.
+The file is memory mapped on load, new or changed entries are written back on exit
+"""
+
+import atexit
+import json
+import mmap
+import os
+import struct
+from typing import Union
+
+import pygame
+
+from config import ASSET_CACHE, USE_ASSET_CACHE
+
+MAGIC = b'BUGINVADERS-ASSETS-2\n'
+HEADER = struct.Struct('<Q')
+
+
+Key = tuple[str, ...]
+
+
+class AssetCache:
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._map: Union[mmap.mmap, None] = None
+        self._index: dict[Key, dict] = {}
+        self._new: dict[Key, tuple[dict, bytes]] = {}
+        self.hits = 0
+        self.misses = 0
+        self._open()
+        atexit.register(self.save)
+
+    def _open(self):
+        try:
+            self._file = open(self.path, 'rb')
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self._map[:len(MAGIC)] != MAGIC:
+                raise ValueError('not an asset cache')
+            (offset,) = HEADER.unpack_from(self._map, len(MAGIC))
+            self._index = {tuple(key): entry for key, entry in json.loads(self._map[offset:].decode())}
+        except (OSError, ValueError, TypeError, struct.error):
+            self._close()
+            self._index = {}
+
+    def _close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @staticmethod
+    def _source_stamp(source):
+        stat = os.stat(source)
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self, key: Key, source) -> Union[pygame.Surface, None]:
+        """Returns the cached surface for key, or None if missing or older than its source file"""
+        try:
+            stamp = list(self._source_stamp(source))
+        except OSError:
+            return None
+        if key in self._new:
+            entry, data = self._new[key]
+        elif key in self._index and self._map is not None:
+            entry = self._index[key]
+            data = self._map[entry['offset']:entry['offset'] + entry['length']]
+        else:
+            self.misses += 1
+            return None
+        if entry['source'] != stamp:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return pygame.image.frombuffer(data, tuple(entry['size']), entry['format'])
+
+    def put(self, key: Key, source, surface: pygame.Surface, pixel_format='RGBA'):
+        entry = {
+            'source': list(self._source_stamp(source)),
+            'size': list(surface.get_size()),
+            'format': pixel_format,
+        }
+        self._new[key] = (entry, pygame.image.tobytes(surface, pixel_format))
+
+    def save(self):
+        """Rewrite the cache file with every entry that is still valid"""
+        if not self._new:
+            return
+        entries = []
+        for key, entry in self._index.items():
+            if key in self._new or self._map is None:
+                continue
+            try:
+                if entry['source'] != list(self._source_stamp(key[0])):
+                    continue
+            except OSError:
+                continue
+            entries.append((key, entry, self._map[entry['offset']:entry['offset'] + entry['length']]))
+        entries.extend((key, entry, data) for key, (entry, data) in self._new.items())
+        self._close()
+        index = []
+        tmp = self.path + '.tmp'
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(tmp, 'wb') as f:
+                f.write(MAGIC)
+                f.write(HEADER.pack(0))
+                for key, entry, data in entries:
+                    index.append([key, dict(entry, offset=f.tell(), length=len(data))])
+                    f.write(data)
+                offset = f.tell()
+                f.write(json.dumps(index).encode())
+                f.seek(len(MAGIC))
+                f.write(HEADER.pack(offset))
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f'could not write asset cache: {e}')
+            return
+        self._new.clear()
+        self._open()
+
+    def clear(self):
+        self._close()
+        self._index = {}
+        self._new.clear()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def make_key(source, *params) -> Key:
+    # the source path always comes first, AssetCache.save checks it for changes
+    return (source, *map(str, params))
+
+
+_cache: Union[AssetCache, None] = None
+
+
+def get_cache() -> Union[AssetCache, None]:
+    global _cache
+    if not USE_ASSET_CACHE:
+        return None
+    if _cache is None:
+        _cache = AssetCache(ASSET_CACHE)
+    return _cache
@@ -0,0 +1,147 @@
+"""
+Packs every pre-scaled sprite frame into a few large atlas surfaces
+
+Frames are named '<sprite>/<index>' and are handed out as subsurfaces of the atlas pages.
+The atlas is built on first use, or ahead of time with `python atlas.py` which saves
+the pages and a json index of frame rects to ATLAS_DIR
+"""
+
+import json
+import os
+from typing import Literal, Union
+
+import pygame
+
+from config import ASSETS
+from utils import SpriteSheet, LoopingSpriteSheet, load_image, get_path
+
+ATLAS_DIR = get_path(ASSETS, 'atlas')
+ATLAS_SIZE = 2048  # max width and height of an atlas page
+PADDING = 1  # transparent pixels between frames to avoid bleeding when scaling
+
+# name: (path, rows, cols, images, scale, color_key)
+SPRITES = {
+    'player': (get_path(ASSETS, 'images', 'player_sheet_2.png'), 1, 3, 3, 3, None),
+    'player_ship': (get_path(ASSETS, 'images', 'player.png'), 1, 1, 1, 2, 'white'),
+    'minibug': (get_path(ASSETS, 'images', 'minibug_sheet.png'), 1, 3, 3, 2, None),
+    'boss': (get_path(ASSETS, 'images', 'boss1.png'), 1, 3, 3, 2, None),
+    'bug_hole': (get_path(ASSETS, 'images', 'bug_hole.png'), 1, 1, 1, 2, None),
+    'bullet': (get_path(ASSETS, 'images', 'bullet1.png'), 1, 1, 1, 2, None),
+    'heart': (get_path(ASSETS, 'images', 'heart.png'), 1, 1, 1, 4, None),
+}
+
+
+def load_frames(path, rows, cols, images, scale, color_key):
+    if rows * cols == 1:
+        return [load_image(path, scale=scale, color_key=color_key)]
+    return SpriteSheet(path, rows, cols, images, True, scale, color_key).get_images()
+
+
+def pack(sizes: dict[str, tuple[int, int]], page_size=ATLAS_SIZE, padding=PADDING):
+    """
+    Shelf packer, tallest frames first
+    returns {name: (page, x, y, w, h)}
+    """
+    index = {}
+    page, x, y, shelf_h = 0, 0, 0, 0
+    for name, (w, h) in sorted(sizes.items(), key=lambda i: (-i[1][1], -i[1][0], i[0])):
+        if w + padding > page_size or h + padding > page_size:
+            raise ValueError(f'frame {name} ({w}x{h}) does not fit in a {page_size}x{page_size} atlas page')
+        if x + w + padding > page_size:  # next shelf
+            x, y, shelf_h = 0, y + shelf_h, 0
+        if y + h + padding > page_size:  # next page
+            page, x, y, shelf_h = page + 1, 0, 0, 0
+        index[name] = (page, x, y, w, h)
+        x += w + padding
+        shelf_h = max(shelf_h, h + padding)
+    return index
+
+
+class TextureAtlas:
+    def __init__(self, pages: list[pygame.Surface], index: dict[str, tuple[int, int, int, int, int]]):
+        self.pages = pages
+        self.index = index
+        self._frames = {name: pages[page].subsurface((x, y, w, h)) for name, (page, x, y, w, h) in index.items()}
+
+    def __contains__(self, name):
+        return name in self._frames
+
+    def frame(self, name) -> pygame.Surface:
+        return self._frames[name]
+
+    def frames(self, sprite) -> list[pygame.Surface]:
+        frames = []
+        while f'{sprite}/{len(frames)}' in self._frames:
+            frames.append(self._frames[f'{sprite}/{len(frames)}'])
+        if not frames:
+            raise KeyError(sprite)
+        return frames
+
+    @classmethod
+    def build(cls, sprites=None, page_size=ATLAS_SIZE):
+        surfaces = {}
+        for sprite, spec in (sprites if sprites is not None else SPRITES).items():
+            for i, surf in enumerate(load_frames(*spec)):
+                surfaces[f'{sprite}/{i}'] = surf
+        index = pack({name: surf.get_size() for name, surf in surfaces.items()}, page_size)
+        pages = []
+        for page in range(max((i[0] for i in index.values()), default=-1) + 1):
+            w = max(x + fw for p, x, y, fw, fh in index.values() if p == page)
+            h = max(y + fh for p, x, y, fw, fh in index.values() if p == page)
+            pages.append(pygame.Surface((w, h), pygame.SRCALPHA))
+        for name, (page, x, y, w, h) in index.items():
+            pages[page].blit(surfaces[name], (x, y))
+        if pygame.display.get_surface() is not None:
+            pages = [i.convert_alpha() for i in pages]
+        return cls(pages, index)
+
+    def save(self, directory=ATLAS_DIR):
+        os.makedirs(directory, exist_ok=True)
+        for i, page in enumerate(self.pages):
+            pygame.image.save(page, get_path(directory, f'atlas_{i}.png'))
+        with open(get_path(directory, 'index.json'), 'w') as f:
+            json.dump({'pages': len(self.pages), 'frames': self.index}, f, indent=1)
+
+    @classmethod
+    def load(cls, directory=ATLAS_DIR):
+        with open(get_path(directory, 'index.json')) as f:
+            data = json.load(f)
+        pages = [pygame.image.load(get_path(directory, f'atlas_{i}.png')) for i in range(data['pages'])]
+        if pygame.display.get_surface() is not None:
+            pages = [i.convert_alpha() for i in pages]
+        return cls(pages, {name: tuple(rect) for name, rect in data['frames'].items()})
+
+
+def _saved_atlas_is_fresh(directory=ATLAS_DIR):
+    # a saved atlas is only used if it is newer than every source image
+    try:
+        built = os.path.getmtime(get_path(directory, 'index.json'))
+        return all(os.path.getmtime(spec[0]) <= built for spec in SPRITES.values())
+    except OSError:
+        return False
+
+
+_atlas: Union[TextureAtlas, None] = None
+
+
+def get_atlas() -> TextureAtlas:
+    global _atlas
+    if _atlas is None:
+        _atlas = TextureAtlas.load() if _saved_atlas_is_fresh() else TextureAtlas.build()
+    return _atlas
+
+
+def frame(name) -> pygame.Surface:
+    return get_atlas().frame(name)
+
+
+def looping_sheet(sprite, timer=0.1, mode: Literal['center', 'topleft'] = 'center', phase=0) -> LoopingSpriteSheet:
+    return LoopingSpriteSheet.from_frames(get_atlas().frames(sprite), timer, mode, phase)
+
+
+if __name__ == '__main__':
+    pygame.display.init()
+    pygame.display.set_mode((1, 1), pygame.HIDDEN)
+    atlas = TextureAtlas.build()
+    atlas.save()
+    print(f'packed {len(atlas.index)} frames into {len(atlas.pages)} page(s) in {ATLAS_DIR}')
@@ -0,0 +1,124 @@
+import os
+from typing import Union
+
+import pygame
+
+from config import ASSETS, VOLUME, SOUND_CHANNELS
+
+get_path = os.path.join
+
+# name: (path, priority, volume), higher priority sounds may steal channels from lower ones
+SOUNDS = {
+    'shot': (get_path(ASSETS, 'sounds', 'shot.wav'), 0, 0.4),
+    'spawn': (get_path(ASSETS, 'sounds', 'spawn.wav'), 1, 0.6),
+    'explosion': (get_path(ASSETS, 'sounds', 'explosion.wav'), 2, 0.8),
+    'player_destroyed': (get_path(ASSETS, 'sounds', 'player_destroyed.wav'), 3, 1.0),
+}
+
+
+class AudioManager:
+    """
+    Plays sound effects on a fixed pool of mixer channels
+
+    The mixer is started and every sound is decoded once, on the first call to init or play.
+    When all channels are busy a sound takes over the channel of the oldest sound with
+    a lower or equal priority, or is dropped if there is none.
+    The same sound is played at most `max_per_frame` times per frame
+    """
+
+    def __init__(self, sounds: dict = None, channels=SOUND_CHANNELS, volume=VOLUME / 100, max_per_frame=1, enabled=True):
+        self.specs = sounds if sounds is not None else SOUNDS
+        self.channel_count = channels
+        self.volume = volume
+        self.max_per_frame = max_per_frame
+        self.enabled = enabled
+        self.initialized = False
+        self.sounds: dict[str, pygame.mixer.Sound] = {}
+        self.channels: list[pygame.mixer.Channel] = []
+        self._playing: list[tuple[int, int]] = []  # (priority, start order) of the last sound on each channel
+        self._order = 0
+        self._frame_counts: dict[str, int] = {}
+        # counters
+        self.played = 0
+        self.stolen = 0
+        self.dropped = 0  # no channel available
+        self.limited = 0  # over the per frame limit
+
+    def init(self):
+        if self.initialized or not self.enabled:
+            return self.initialized
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+        except pygame.error:  # no audio device
+            self.enabled = False
+            return False
+        pygame.mixer.set_num_channels(self.channel_count)
+        pygame.mixer.set_reserved(self.channel_count)  # keep Sound.play from picking our channels
+        self.channels = [pygame.mixer.Channel(i) for i in range(self.channel_count)]
+        self._playing = [(0, 0)] * self.channel_count
+        self.initialized = True
+        self.preload()
+        return True
+
+    def preload(self):
+        for name, (path, priority, volume) in self.specs.items():
+            if name in self.sounds or not os.path.exists(path):
+                continue
+            sound = pygame.mixer.Sound(path)
+            sound.set_volume(volume)
+            self.sounds[name] = sound
+
+    def set_volume(self, volume):
+        self.volume = volume
+        for channel in self.channels:
+            channel.set_volume(volume)
+
+    def _get_channel(self, priority) -> Union[int, None]:
+        steal = None
+        for index, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                return index
+            playing = self._playing[index]
+            if playing[0] <= priority and (steal is None or playing < self._playing[steal]):
+                steal = index
+        if steal is not None:
+            self.stolen += 1
+        return steal
+
+    def play(self, name, priority=None) -> Union[pygame.mixer.Channel, None]:
+        if not self.init():
+            return None
+        sound = self.sounds.get(name)
+        if sound is None:
+            return None
+        count = self._frame_counts.get(name, 0)
+        if count >= self.max_per_frame:
+            self.limited += 1
+            return None
+        if priority is None:
+            priority = self.specs[name][1]
+        index = self._get_channel(priority)
+        if index is None:
+            self.dropped += 1
+            return None
+        self._frame_counts[name] = count + 1
+        self._order += 1
+        self._playing[index] = (priority, self._order)
+        channel = self.channels[index]
+        channel.set_volume(self.volume)
+        channel.play(sound)
+        self.played += 1
+        return channel
+
+    def end_frame(self):
+        # called once per frame by the game loop to reset the per frame limits
+        if self._frame_counts:
+            self._frame_counts.clear()
+
+    def stop_all(self):
+        for channel in self.channels:
+            channel.stop()
+
+
+AUDIO = AudioManager()
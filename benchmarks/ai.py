@@ -0,0 +1,80 @@
+"""
+AI scheduler cost per frame for growing wave sizes
+
+Agents are spread over the screen and steer towards a moving focus point,
+every frame reports the time spent in AIScheduler.update and the number of decisions made
+
+usage: python benchmarks/ai.py [--frames 300] [--sizes 50 200 1000 5000]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from ai import AIScheduler
+from config import WIDTH, HEIGHT, FPS
+from utils import get_numpy
+
+
+class Agent:
+    def __init__(self, focus):
+        self.x = random.uniform(0, WIDTH)
+        self.y = random.uniform(0, HEIGHT)
+        self.angle = 270
+        self.alive = True
+        self.target = None
+        self.focus = focus
+
+    def use_ai(self):
+        # stand in for a real decision, a bit of work and a new steering target
+        total = 0
+        for i in range(200):
+            total += i
+        self.target = (self.focus.x, self.focus.y)
+
+
+class Focus:
+    x, y = WIDTH / 2, HEIGHT - 100
+
+
+def run(size, frames, budget_ms):
+    focus = Focus()
+    scheduler = AIScheduler(budget_ms=budget_ms)
+    for _ in range(size):
+        scheduler.add(Agent(focus))
+    times, decisions, deferred = [], [], []
+    for frame in range(frames):
+        focus.x = WIDTH / 2 + WIDTH / 3 * (frame % 120 / 60 - 1)
+        start = time.perf_counter()
+        scheduler.update(1 / FPS, focus)
+        times.append((time.perf_counter() - start) * 1000)
+        decisions.append(scheduler.decisions)
+        deferred.append(scheduler.deferred)
+    return times, decisions, deferred
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 200, 1000, 5000])
+    parser.add_argument('--budget', type=float, default=1.0, help='decision budget per frame in ms')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f'numpy steering: {"yes" if get_numpy() is not None else "no"}')
+    for size in args.sizes:
+        random.seed(args.seed)
+        times, decisions, deferred = run(size, args.frames, args.budget)
+        times.sort()
+        print(f'{size:>6} agents: mean {statistics.mean(times):.3f} ms, p95 {times[int(len(times) * 0.95)]:.3f} ms, '
+              f'{statistics.mean(decisions):.1f} decisions / frame, {statistics.mean(deferred):.1f} deferred')
+
+
+if __name__ == '__main__':
+    main()
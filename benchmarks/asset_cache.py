@@ -0,0 +1,57 @@
+"""
+Cold vs warm startup with the on-disk asset cache
+
+Every run starts the game in a fresh process with `main.py --first-frame` and SDL's dummy drivers
+and reads its time to first frame: cold runs delete the cache first,
+warm runs reuse the file written by the previous run
+
+usage: python benchmarks/asset_cache.py [--runs 5]
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+from config import ASSET_CACHE
+
+FIRST_FRAME_LINE = re.compile(r'time to first frame: ([\d.]+) ms')
+
+
+def run(mode):
+    if mode == 'cold':
+        (ROOT / ASSET_CACHE).unlink(missing_ok=True)
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy', SDL_AUDIODRIVER='dummy', PYGAME_HIDE_SUPPORT_PROMPT='1')
+    out = subprocess.run([sys.executable, 'main.py', '--first-frame'], cwd=ROOT, env=env, capture_output=True,
+                         text=True, check=True)
+    match = FIRST_FRAME_LINE.search(out.stdout)
+    if match is None:
+        raise RuntimeError(f'no first frame reported:\n{out.stdout}\n{out.stderr[-2000:]}')
+    return float(match.group(1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    results = {'cold': [], 'warm': []}
+    for _ in range(args.runs):
+        for mode in results:
+            results[mode].append(run(mode))
+    for mode, times in results.items():
+        print(f'{mode}: time to first frame median {statistics.median(times):.1f} ms, min {min(times):.1f} ms '
+              f'over {len(times)} runs')
+    cold, warm = statistics.median(results['cold']), statistics.median(results['warm'])
+    print(f'speedup: {cold / warm:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Redraw rate and CPU use of the game loop sitting on a scene without input
+
+Runs the real game loop with SDL's dummy drivers for a few seconds per scene and
+reports frames rendered, how many of them were idle frames and the CPU time used
+
+usage: python benchmarks/idle.py [--seconds 5] [--scenes waveover home]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+from game import Game
+
+
+def measure(scene, seconds, idle_fps):
+    game = Game()
+    game.scheduler.idle_fps = idle_fps
+    game.manager.switch_mode(scene)
+    cpu, wall = time.process_time(), time.perf_counter()
+    try:
+        asyncio.run(asyncio.wait_for(game.run(), seconds))
+    except asyncio.TimeoutError:
+        pass
+    cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+    scheduler = game.scheduler
+    print(f'{scene:>10}: {scheduler.frames_rendered} frames ({scheduler.frames_rendered / wall:.1f} / s), '
+          f'{scheduler.idle_frames} idle, cpu {cpu / wall * 100:.1f}%')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--scenes', nargs='+', default=['waveover', 'home'])
+    parser.add_argument('--idle-fps', type=float, default=None, help='defaults to IDLE_FPS from config')
+    args = parser.parse_args()
+
+    from config import IDLE_FPS
+    for scene in args.scenes:
+        measure(scene, args.seconds, args.idle_fps if args.idle_fps is not None else IDLE_FPS)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Frame pacing jitter and input latency of each pacing strategy
+
+A thread posts timestamped key presses at random intervals while a loop with a
+variable amount of work per frame runs at FPS, for every strategy in turn
+
+usage: python benchmarks/pacing.py [--seconds 5] [--strategies tick busy hybrid]
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pygame
+
+from config import WIDTH, HEIGHT, FPS
+from pacing import FramePacer, LatencyTracker
+
+
+def press_keys(stop: threading.Event):
+    while not stop.is_set():
+        time.sleep(random.uniform(0.02, 0.1))
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE, timestamp=time.perf_counter()))
+
+
+def run(strategy, seconds, screen, max_work):
+    pacer = FramePacer(FPS, strategy)
+    latency = LatencyTracker()
+    stop = threading.Event()
+    presser = threading.Thread(target=press_keys, args=(stop,), daemon=True)
+    presser.start()
+    cpu, end = time.process_time(), time.perf_counter() + seconds
+    frame = 0
+    pacer.wait(0, record=False)
+    while time.perf_counter() < end:
+        latency.note_events(pygame.event.get())
+        latency.frame_recorded(frame)
+        # stand in for update and draw
+        work_end = time.perf_counter() + random.uniform(0, max_work)
+        while time.perf_counter() < work_end:
+            pass
+        screen.fill((frame % 255, 0, 0))
+        pygame.display.update()
+        latency.frame_presented(frame)
+        frame += 1
+        pacer.wait()
+    stop.set()
+    presser.join()
+    cpu = time.process_time() - cpu
+    print(f'--- {strategy}: {frame} frames, cpu {cpu / seconds * 100:.1f}%')
+    print(pacer.report())
+    print(latency.report())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--strategies', nargs='+', default=list(FramePacer.STRATEGIES))
+    parser.add_argument('--max-work', type=float, default=0.008, help='upper bound of the simulated work per frame (s)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    pygame.display.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    for strategy in args.strategies:
+        random.seed(args.seed)
+        run(strategy, args.seconds, screen, args.max_work)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Cost of the enemy bullet engine at a given number of live projectiles
+
+A ring pattern keeps the field topped up to --bullets live bullets, every frame
+runs the simulation, the hit test against a player sized rect and the batched draw
+
+usage: python benchmarks/patterns.py [--frames 600] [--bullets 5000]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pygame
+
+from config import WIDTH, HEIGHT, FPS
+from patterns import BulletField, Pattern, Ring, Spiral
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--bullets', type=int, default=5000)
+    args = parser.parse_args()
+
+    pygame.display.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    image = pygame.Surface((10, 16), pygame.SRCALPHA)
+    pygame.draw.ellipse(image, 'red', image.get_rect())
+    image = image.convert_alpha()
+
+    field = BulletField(image)
+    pattern = Pattern([Ring(count=72, speed=90, interval=1 / FPS, rotation=3), Spiral(arms=6, speed=140, interval=1 / FPS, spin=7)])
+    player = pygame.Rect(0, 0, 40, 40)
+    player.center = (WIDTH // 2, HEIGHT - 100)
+    x, y, dt = WIDTH / 2, HEIGHT / 3, 1 / FPS
+
+    timings = {'update': [], 'hit test': [], 'draw': []}
+    frame = 0
+    while frame < args.frames:
+        if len(field) < args.bullets:
+            pattern.update(dt, x, y, player.center, field)
+        start = time.perf_counter()
+        field.update(dt)
+        simulated = time.perf_counter()
+        field.hit_test(player)
+        tested = time.perf_counter()
+        screen.fill('black')
+        field.draw(screen)
+        drawn = time.perf_counter()
+        pygame.display.update()
+        if len(field) >= args.bullets * 0.9:  # only measure once the field is full
+            timings['update'].append((simulated - start) * 1000)
+            timings['hit test'].append((tested - simulated) * 1000)
+            timings['draw'].append((drawn - tested) * 1000)
+            frame += 1
+
+    total = [sum(i) for i in zip(*timings.values())]
+    print(f'{len(field)} live bullets at the end, frame budget {1000 / FPS:.2f} ms')
+    for name, values in list(timings.items()) + [('total', total)]:
+        print(f'{name:>9}: mean {statistics.mean(values):.3f} ms, max {max(values):.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+Frame time with and without the render thread under heavy particle load
+
+Keeps a fixed number of explosions and rotating sprites alive and measures the average
+time per frame (update + draw + present) in single-threaded and pipelined mode
+
+usage: python benchmarks/pipeline.py [--frames 600] [--explosions 40] [--sprites 300]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pygame
+
+from config import WIDTH, HEIGHT, FPS
+from objects import Explosion
+from pipeline import RenderThread
+from render import DrawList, draw_image
+
+
+class Spinner:
+    def __init__(self, image):
+        self.image = image
+        self.x = random.randrange(WIDTH)
+        self.y = random.randrange(HEIGHT)
+        self.angle = random.randrange(360)
+
+    def update(self, dt):
+        self.angle = (self.angle + 90 * dt) % 360
+
+    def draw(self, surf):
+        draw_image(surf, self.image, self.x, self.y, self.angle, 1.5)
+
+
+def make_world(explosions, sprites):
+    image = pygame.Surface((32, 32), pygame.SRCALPHA)
+    pygame.draw.circle(image, 'red', (16, 16), 14)
+    pygame.draw.rect(image, 'black', (8, 4, 16, 8))
+    world = [Spinner(image) for _ in range(sprites)]
+    world += [Explosion(random.randrange(WIDTH), random.randrange(HEIGHT), ('red', 'black'), particles_per_line=15,
+                        max_particle_size=7) for _ in range(explosions)]
+    return world
+
+
+def step(world, dt):
+    for i in world:
+        if isinstance(i, Explosion):
+            i.update([], dt)
+            if not i.alive:
+                i.alive, i.r = True, 0
+        else:
+            i.update(dt)
+
+
+def run_single(world, screen, frames, dt):
+    times = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        step(world, dt)
+        screen.fill('black')
+        for i in world:
+            i.draw(screen)
+        pygame.display.update()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def run_pipelined(world, screen, frames, dt):
+    render_thread = RenderThread(screen)
+    times = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        step(world, dt)
+        draw_list = DrawList(screen.get_size())
+        draw_list.fill('black')
+        for i in world:
+            i.draw(draw_list)
+        if render_thread.wait():
+            pygame.display.update()
+        render_thread.submit(draw_list)
+        times.append(time.perf_counter() - start)
+    render_thread.wait()
+    render_thread.stop()
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--explosions', type=int, default=40)
+    parser.add_argument('--sprites', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    pygame.display.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    for name, run in (('single-threaded', run_single), ('pipelined', run_pipelined)):
+        random.seed(args.seed)
+        world = make_world(args.explosions, args.sprites)
+        run(world, screen, 30, 1 / FPS)  # warm up
+        times = run(world, screen, args.frames, 1 / FPS)
+        times_ms = sorted(i * 1000 for i in times)
+        print(f'{name:>16}: mean {statistics.mean(times_ms):.2f} ms, '
+              f'p50 {times_ms[len(times_ms) // 2]:.2f} ms, p95 {times_ms[int(len(times_ms) * 0.95)]:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
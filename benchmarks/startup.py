@@ -0,0 +1,93 @@
+"""
+Startup report: -X importtime breakdown and time to first presented frame
+
+Runs `main.py --first-frame` in fresh processes with SDL's dummy drivers.
+With --check the median time to first frame is compared against a saved baseline
+and the script exits with status 1 on a regression
+
+usage:
+    python benchmarks/startup.py --runs 5 --save-baseline
+    python benchmarks/startup.py --runs 5 --check
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+BASELINE = Path(__file__).resolve().parent / 'startup_baseline.json'
+
+IMPORT_LINE = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+FIRST_FRAME_LINE = re.compile(r'time to first frame: ([\d.]+) ms')
+
+
+def run_once():
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy', SDL_AUDIODRIVER='dummy', PYGAME_HIDE_SUPPORT_PROMPT='1')
+    out = subprocess.run([sys.executable, '-X', 'importtime', 'main.py', '--first-frame'],
+                         cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    imports = []
+    for line in out.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            depth = (len(indent) - 1) // 2
+            imports.append((name, int(self_us), int(cumulative_us), depth))
+    match = FIRST_FRAME_LINE.search(out.stdout)
+    if match is None:
+        raise RuntimeError(f'no first frame reported:\n{out.stdout}\n{out.stderr[-2000:]}')
+    return imports, float(match.group(1))
+
+
+def report(imports, top):
+    total = sum(i[1] for i in imports)
+    print(f'total import time: {total / 1000:.1f} ms over {len(imports)} modules')
+    print('\ntop-level imports by cumulative time:')
+    for name, self_us, cumulative_us, depth in sorted((i for i in imports if i[3] == 0), key=lambda i: -i[2])[:top]:
+        print(f'  {cumulative_us / 1000:8.1f} ms  {name}')
+    print('\nmodules by self time:')
+    for name, self_us, cumulative_us, depth in sorted(imports, key=lambda i: -i[1])[:top]:
+        print(f'  {self_us / 1000:8.1f} ms  {name}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--baseline', type=Path, default=BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--check', action='store_true', help='fail if slower than the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed slowdown over the baseline (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    first_frames = []
+    imports = []
+    for _ in range(args.runs):
+        imports, first_frame = run_once()
+        first_frames.append(first_frame)
+    report(imports, args.top)
+    median = statistics.median(first_frames)
+    print(f'\ntime to first frame: median {median:.1f} ms, min {min(first_frames):.1f} ms, max {max(first_frames):.1f} ms')
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps({'time_to_first_frame_ms': median}, indent=1))
+        print(f'saved baseline to {args.baseline}')
+    if args.check:
+        try:
+            baseline = json.loads(args.baseline.read_text())['time_to_first_frame_ms']
+        except FileNotFoundError:
+            print(f'no baseline at {args.baseline}, record one first with --save-baseline')
+            sys.exit(1)
+        limit = baseline * (1 + args.tolerance)
+        print(f'baseline {baseline:.1f} ms, limit {limit:.1f} ms')
+        if median > limit:
+            print('startup regression')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
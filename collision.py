@@ -0,0 +1,56 @@
+import weakref
+
+import pygame
+
+MASK_ROTATION_STEP = 15  # masks are generated for angles rounded to multiples of this
+
+# sprite frame -> {quantized angle: mask}, shared by every object drawing that frame
+_masks: 'weakref.WeakKeyDictionary[pygame.Surface, dict[int, pygame.mask.Mask]]' = weakref.WeakKeyDictionary()
+
+
+def quantize_angle(angle):
+    return round(angle / MASK_ROTATION_STEP) * MASK_ROTATION_STEP % 360
+
+
+def get_mask(image: pygame.Surface, angle=0) -> pygame.mask.Mask:
+    angle = quantize_angle(angle)
+    try:
+        masks = _masks[image]
+    except KeyError:
+        masks = _masks[image] = {}
+    try:
+        return masks[angle]
+    except KeyError:
+        rotated = pygame.transform.rotate(image, angle) if angle else image
+        mask = masks[angle] = pygame.mask.from_surface(rotated)
+        return mask
+
+
+def bounds(obj) -> pygame.Rect:
+    """Rect of the rotated sprite frame of obj, or obj.rect if it has no mask image"""
+    image = obj.mask_image
+    if image is None:
+        return obj.rect
+    return get_mask(image, obj.mask_angle).get_rect(center=(obj.x, obj.y))
+
+
+def overlap(a, b) -> int:
+    """
+    Number of overlapping pixels between two objects, 0 if they don't touch
+    objects without a mask_image fall back to the area of their rect intersection
+    """
+    a_image, b_image = a.mask_image, b.mask_image
+    if a_image is None or b_image is None:
+        a_rect, b_rect = a.rect, b.rect
+        if not a_rect.colliderect(b_rect):
+            return 0
+        clip = a_rect.clip(b_rect)
+        return clip.w * clip.h
+    a_mask = get_mask(a_image, a.mask_angle)
+    b_mask = get_mask(b_image, b.mask_angle)
+    a_rect = a_mask.get_rect(center=(a.x, a.y))
+    b_rect = b_mask.get_rect(center=(b.x, b.y))
+    # cheap broadphase before touching any pixels
+    if not a_rect.colliderect(b_rect):
+        return 0
+    return a_mask.overlap_area(b_mask, (b_rect.x - a_rect.x, b_rect.y - a_rect.y))
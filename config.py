@@ -17,9 +17,23 @@ VIEWPORT_RECT = pygame.Rect(
     HEIGHT - VIEWPORT_OFFSET[2] - VIEWPORT_OFFSET[3]
 )
 BG_COlOR = '#111111'
+RENDER_BACKEND = 'surface'  # 'surface' for software blits or 'renderer' for pygame._sdl2 textures
+SOFTWARE_RENDERER = False  # use SDL's software renderer with the 'renderer' backend (no gpu required)
 VOLUME = 100  # sound volume
-FPS = 60
+SOUND_CHANNELS = 16  # mixer channels shared by all sound effects
+FPS = 60  # render rate cap
+IDLE_FPS = 2  # redraw rate when nothing is animating and there is no input, 0 to wait for input
+IDLE_DELAY = 1.0  # seconds without animation or input before dropping to IDLE_FPS
+PACING = 'tick'  # frame pacing strategy: 'tick' (sleep), 'busy' (spin) or 'hybrid' (sleep then spin)
+PACING_SPIN_MARGIN = 0.002  # seconds before the deadline the hybrid strategy stops sleeping and spins
+QUALITY_GOVERNOR = True  # lower effect quality automatically when frames go over budget
+PIPELINED_RENDERING = False  # rasterize the previous frame on a render thread while the next one is updated
+FIXED_UPDATE_RATE = 0  # logic updates per second, 0 to update once per rendered frame with a variable dt
+MAX_FRAME_TIME = 0.25  # longest frame (in seconds) the simulation will catch up on
+AI_BUDGET_MS = 1.0  # time per frame the AI scheduler may spend on decisions
 ASSETS = 'assets'
+USE_ASSET_CACHE = True  # keep decoded and scaled images on disk for faster startup
+ASSET_CACHE = '.asset_cache'
 
 
 # for handling global objects
@@ -46,7 +60,6 @@ class Globals:
 # for closing pyinstaller splash screen if loaded from bundle
 
 if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'):
-    print('running in a PyInstaller bundle')
     ASSETS = os.path.join(sys._MEIPASS, ASSETS)
     try:
         import pyi_splash
@@ -54,5 +67,3 @@ if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'):
         pyi_splash.close()
     except ImportError:
         pass
-else:
-    print('running in a normal Python process')
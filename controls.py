@@ -0,0 +1,118 @@
+import pygame
+
+DEFAULT_ACTIONS = {
+    'left': pygame.K_LEFT,
+    'right': pygame.K_RIGHT,
+    'up': pygame.K_UP,
+    'down': pygame.K_DOWN,
+    'confirm': pygame.K_RETURN,
+    'back': pygame.K_ESCAPE,
+}
+
+
+class InputState:
+    """
+    Snapshot of the input for a single frame
+
+    The raw pygame events are processed once per frame by the game loop,
+    every other consumer reads the snapshot instead of rescanning the events
+    """
+
+    def __init__(self, actions: dict[str, int] = None):
+        self.actions: dict[str, int] = {}
+        self._action_bits: dict[str, int] = {}
+        self._key_actions: dict[int, str] = {}
+        for action, key in (actions if actions is not None else DEFAULT_ACTIONS).items():
+            self.bind(action, key)
+        self.events: list[pygame.event.Event] = []
+        self.keys = None  # result of pygame.key.get_pressed() for this frame
+        self.downs: tuple[int, ...] = ()  # keys pressed this frame, in event order
+        self.ups: tuple[int, ...] = ()  # keys released this frame, in event order
+        self.action_downs: tuple[str, ...] = ()
+        self.action_ups: tuple[str, ...] = ()
+        self.action_events: tuple[tuple[bool, str], ...] = ()  # (pressed, action) for every bound key event, in order
+        self.pressed = 0  # bitset of held actions
+        self.mouse_downs: tuple[int, ...] = ()
+        self.clicks: tuple[tuple[int, int], ...] = ()  # positions of left clicks this frame
+        self.mouse_pos = (-1, -1)  # last known mouse position, from motion and button events
+        self.mouse_moved = False
+        self.text = ''
+        self.quit = False
+
+    def bind(self, action: str, key: int):
+        if action not in self._action_bits:
+            self._action_bits[action] = 1 << len(self._action_bits)
+        old_key = self.actions.get(action)
+        if old_key is not None:
+            self._key_actions.pop(old_key, None)
+        self.actions[action] = key
+        self._key_actions[key] = action
+
+    def mask(self, *actions: str) -> int:
+        m = 0
+        for action in actions:
+            m |= self._action_bits[action]
+        return m
+
+    def process(self, events: list[pygame.event.Event], keys=None):
+        """Build the snapshot for this frame, keys can be passed in to drive the input without a window"""
+        self.events = events
+        self.keys = keys if keys is not None else pygame.key.get_pressed()
+        downs, ups, key_events, mouse_downs, clicks, typed = [], [], [], [], [], []
+        self.quit = False
+        self.mouse_moved = False
+        for e in events:
+            if e.type == pygame.KEYDOWN:
+                downs.append(e.key)
+                key_events.append((True, e.key))
+            elif e.type == pygame.KEYUP:
+                ups.append(e.key)
+                key_events.append((False, e.key))
+            elif e.type == pygame.MOUSEMOTION:
+                self.mouse_pos = e.pos
+                self.mouse_moved = True
+            elif e.type == pygame.MOUSEBUTTONDOWN:
+                mouse_downs.append(e.button)
+                if e.button == 1:
+                    clicks.append(e.pos)
+                if e.pos != self.mouse_pos:
+                    self.mouse_pos = e.pos
+                    self.mouse_moved = True
+            elif e.type == pygame.TEXTINPUT:
+                typed.append(e.text)
+            elif e.type == pygame.QUIT:
+                self.quit = True
+        self.downs = tuple(downs)
+        self.ups = tuple(ups)
+        self.mouse_downs = tuple(mouse_downs)
+        self.clicks = tuple(clicks)
+        self.text = ''.join(typed)
+        key_actions = self._key_actions
+        self.action_downs = tuple(key_actions[k] for k in downs if k in key_actions)
+        self.action_ups = tuple(key_actions[k] for k in ups if k in key_actions)
+        self.action_events = tuple((pressed, key_actions[k]) for pressed, k in key_events if k in key_actions)
+        pressed = 0
+        for action, key in self.actions.items():
+            if self.keys[key]:
+                pressed |= self._action_bits[action]
+        self.pressed = pressed
+        return self
+
+    def key_down(self, key: int) -> bool:
+        return key in self.downs
+
+    def key_up(self, key: int) -> bool:
+        return key in self.ups
+
+    def key_pressed(self, key: int) -> bool:
+        return bool(self.keys[key]) if self.keys is not None else False
+
+    def action_pressed(self, action: str) -> bool:
+        return bool(self.pressed & self._action_bits[action])
+
+    def any_pressed(self, mask: int) -> bool:
+        return bool(self.pressed & mask)
+
+
+# shared snapshot, refreshed once per frame by the game loop
+INPUT = InputState()
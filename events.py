@@ -1,12 +1,17 @@
+from typing import Callable, Union
+
+
 class Event:
+    type = 'Event'
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.type = cls.__name__  # resolved once per class instead of on every access
+
     def __init__(self, **kwargs):
         for i, j in kwargs.items():
             self.__setattr__(i, j)
 
-    @property
-    def type(self):
-        return self.__class__.__name__
-
     def property(self, prop):
         try:
             return self.__getattribute__(prop)
@@ -22,11 +27,38 @@ class ButtonClickedEvent(Event):
     pass
 
 
+class BugDestroyedEvent(Event):
+    pass
+
+
 class EventsManager:
-    MAX_EVENTS = 100
+    """
+    Fixed size ring buffer of events with per event type subscribers
+
+    overflow policies:
+    drop_newest - events posted to a full buffer are discarded
+    drop_oldest - the oldest queued event is overwritten
+    grow - the buffer doubles its capacity
+    """
 
-    def __init__(self):
-        self._events: list[Event] = []
+    MAX_EVENTS = 100
+    OVERFLOW_POLICIES = ('drop_newest', 'drop_oldest', 'grow')
+
+    def __init__(self, capacity=MAX_EVENTS, overflow='drop_newest'):
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(f'unknown overflow policy {overflow!r}, expected one of {self.OVERFLOW_POLICIES}')
+        if capacity < 1:
+            raise ValueError(f'capacity must be at least 1, got {capacity}')
+        self._events: list[Union[Event, None]] = [None] * capacity
+        self._head = 0  # index of the next event to be polled
+        self._count = 0
+        self.overflow = overflow
+        self._subscribers: dict[str, list[Callable]] = {}
+        # counters
+        self.posted = 0
+        self.dropped = 0
+        self.overwritten = 0
+        self.grown = 0
 
         def function(event):
             if isinstance(event, Event):
@@ -34,31 +66,92 @@ class EventsManager:
 
         self.process_event = function
 
+    def __len__(self):
+        return self._count
+
+    @property
+    def capacity(self):
+        return len(self._events)
+
     def set_process_event(self, function):
+        # catch-all handler for events that have no subscribers
         self.process_event = function
 
+    def subscribe(self, event_type: Union[type, str], function: Callable):
+        if isinstance(event_type, type):
+            event_type = event_type.type
+        self._subscribers.setdefault(event_type, []).append(function)
+
+    def unsubscribe(self, event_type: Union[type, str], function: Callable):
+        if isinstance(event_type, type):
+            event_type = event_type.type
+        try:
+            self._subscribers[event_type].remove(function)
+        except (KeyError, ValueError):
+            pass
+
+    def dispatch(self, event: Event):
+        subscribers = self._subscribers.get(event.type)
+        if subscribers:
+            for function in subscribers:
+                function(event)
+        else:
+            self.process_event(event)
+
     def process_all_events(self):
-        for i in self.get():
-            self.process_event(i)
-        self.clear()
+        # events posted by handlers while processing are handled in the same pass
+        while self._count:
+            self.dispatch(self.poll())
 
     def clear(self):
-        self._events.clear()
+        for i in range(self._count):
+            self._events[(self._head + i) % len(self._events)] = None
+        self._head = 0
+        self._count = 0
+
+    def _grow(self):
+        events = self.get()
+        self._events = events + [None] * len(self._events)
+        self._head = 0
+        self.grown += 1
 
     def post(self, event=None, **kwargs):
-        if len(self._events) < self.MAX_EVENTS:
-            if event:
-                self._events.append(event)
+        if not event:
+            event = GenericEvent(**kwargs)
+        capacity = len(self._events)
+        if self._count == capacity:
+            if self.overflow == 'drop_newest':
+                self.dropped += 1
+                return
+            elif self.overflow == 'drop_oldest':
+                self._events[self._head] = event
+                self._head = (self._head + 1) % capacity
+                self.overwritten += 1
+                self.posted += 1
+                return
             else:
-                self._events.append(GenericEvent(**kwargs))
+                self._grow()
+                capacity = len(self._events)
+        self._events[(self._head + self._count) % capacity] = event
+        self._count += 1
+        self.posted += 1
 
     def get(self, clear=False):
-        if clear:
-            events = self._events.copy()
-            self._events.clear()
-            return events
+        capacity = len(self._events)
+        end = self._head + self._count
+        if end <= capacity:
+            events = self._events[self._head:end]
         else:
-            return self._events
+            events = self._events[self._head:] + self._events[:end - capacity]
+        if clear:
+            self.clear()
+        return events
 
     def poll(self):
-        return self._events.pop(0)
+        if not self._count:
+            raise IndexError('poll from empty events manager')
+        event = self._events[self._head]
+        self._events[self._head] = None
+        self._head = (self._head + 1) % len(self._events)
+        self._count -= 1
+        return event
@@ -1,60 +1,144 @@
 import asyncio
+import sys
 import time
 
 import pygame
 
-from config import *
+from animation import ANIMATIONS
+from audio import AUDIO
+from config import FPS, FIXED_UPDATE_RATE, MAX_FRAME_TIME, RENDER_BACKEND, SOFTWARE_RENDERER, PIPELINED_RENDERING, PACING
+from controls import INPUT
+from pacing import LatencyTracker
+from pipeline import RenderThread
+from quality import QUALITY
+from render import create_backend, DrawList
 from scene import SceneManager
-from utils import *
-
-from pygame._sdl2.video import Window, Renderer, Texture, Image
+from scheduler import FrameScheduler
 
 from pathlib import Path
 
 parent = Path(__file__).parent
 sys.path.append(parent.absolute().__str__())
 
-pygame.init()
+# only the subsystems the game uses, the mixer is started on demand
+pygame.display.init()
+pygame.font.init()
 
 # pygame.key.set_repeat(500, 50)
 
 
 class Game:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT)) # , pygame.SCALED | pygame.FULLSCREEN)
-        # self.window = Window("save the crabs", (WIDTH, HEIGHT))
-        # self.renderer = Renderer(self.window, target_texture=True)
-        # self.renderer.logical_size = (WIDTH, HEIGHT)
-        self.full_screen = False
+    BG_COLOR = (247, 213, 147)
+
+    def __init__(self, fixed_update_rate=FIXED_UPDATE_RATE, backend=RENDER_BACKEND, start_time=None, first_frame_only=False,
+                 pipelined=PIPELINED_RENDERING, pacing=PACING, report_pacing=False):
+        self.start_time = start_time if start_time is not None else time.perf_counter()
+        self.first_frame_only = first_frame_only  # exit once the first frame is presented, for startup measurements
+        self.time_to_first_frame = None
+        if backend == 'renderer':
+            self.backend = create_backend(backend, software=SOFTWARE_RENDERER)
+        else:
+            self.backend = create_backend(backend)
         self.manager = SceneManager()
-        self.clock = pygame.time.Clock()
+        self.scheduler = FrameScheduler(pacing=pacing)
+        self.clock = self.scheduler.clock
+        self.latency = LatencyTracker()
+        self.report_pacing = report_pacing  # print jitter and latency histograms on quit
+        self.frame = 0
+        self.dt = 1 / FPS  # duration of the last frame in seconds
+        self.fixed_dt = 1 / fixed_update_rate if fixed_update_rate else 0
+        self.accumulator = 0.0
+        self._pending_events: list[pygame.event.Event] = []
+        # the render thread rasterizes into the display surface, so only the surface backend can be pipelined
+        self.render_thread = RenderThread(self.screen) if pipelined and backend == 'surface' else None
+
+    @property
+    def screen(self):
+        return self.backend.surface
+
+    @property
+    def full_screen(self):
+        return self.backend.full_screen
 
     def toggle_full_screen(self):
-        self.full_screen = not self.full_screen
-        if self.full_screen:
-            self.screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.SCALED | pygame.FULLSCREEN)
-        else:
-            self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        if self.render_thread is not None and self.render_thread.wait():
+            self.backend.present()  # the frame in flight was drawn onto the old display surface
+        self.backend.toggle_full_screen()
+        if self.render_thread is not None:
+            self.render_thread.set_target(self.screen)
+
+    def draw(self):
+        self.backend.begin(self.BG_COLOR)
+        self.manager.draw(self.screen)
+        # fps = self.clock.get_fps()
+        # self.screen.blit(text('FPS', 64), (10, 20))
+        # self.screen.blit(text(f'{round(fps)}', 64), (10, 80))
+        # pygame.draw.rect(self.screen, 'black', VIEWPORT_RECT, 2)
+        self.backend.present()
+        return True
+
+    def draw_pipelined(self):
+        # records this frame, presents the previous one and hands this one over to the render thread
+        draw_list = DrawList(self.screen.get_size())
+        draw_list.fill(self.BG_COLOR)
+        self.manager.draw(draw_list)
+        presented = self.render_thread.wait()
+        if presented:
+            self.backend.present()
+        self.render_thread.submit(draw_list)
+        return presented
+
+    def update(self, events: list[pygame.event.Event], dt):
+        # advances the simulation by dt seconds, in fixed steps if a fixed update rate is set
+        dt = min(dt, MAX_FRAME_TIME)
+        if not self.fixed_dt:
+            self.manager.update(events, dt)
+            return
+        # events are held back until a step consumes them so that no key press is lost
+        self._pending_events.extend(events)
+        self.accumulator += dt
+        while self.accumulator >= self.fixed_dt:
+            self.accumulator -= self.fixed_dt
+            events, self._pending_events = self._pending_events, []
+            INPUT.process(events, INPUT.keys)
+            self.manager.update(events, self.fixed_dt)
 
     async def run(self):
-        while True:
-            events = pygame.event.get()
-            for e in events:
-                if e.type == pygame.QUIT:
+        # scenes may also quit with sys.exit, the reports are printed however the loop ends
+        try:
+            while True:
+                events = self.scheduler.get_events()
+                self.latency.note_events(events)
+                self.scheduler.note_events(events)
+                INPUT.process(events)
+                if INPUT.quit:
                     sys.exit(0)
-                if e.type == pygame.KEYDOWN:
-                    if e.key == pygame.K_f:
-                        self.toggle_full_screen()
-            await asyncio.sleep(0)
-            self.screen.fill((247, 213, 147))
-            # self.screen.fill(0)
-            self.manager.update(events)
-            self.manager.draw(self.screen)
-            # fps = self.clock.get_fps()
-            # self.screen.blit(text('FPS', 64), (10, 20))
-            # self.screen.blit(text(f'{round(fps)}', 64), (10, 80))
-            # pygame.draw.rect(self.screen, 'black', VIEWPORT_RECT, 2)
-            pygame.display.update()
-            # self.renderer.present()
-            self.clock.tick(FPS)
-            # print(self.clock.get_fps())
+                if INPUT.key_down(pygame.K_f):
+                    self.toggle_full_screen()
+                await asyncio.sleep(0)
+                frame_start = time.perf_counter()
+                self.update(events, self.dt)
+                ANIMATIONS.tick(self.dt)
+                self.latency.frame_recorded(self.frame)
+                if self.render_thread is None:
+                    presented, presented_frame = self.draw(), self.frame
+                else:
+                    presented, presented_frame = self.draw_pipelined(), self.frame - 1  # the previous frame
+                if presented:
+                    self.latency.frame_presented(presented_frame)
+                self.frame += 1
+                QUALITY.record(time.perf_counter() - frame_start)
+                self.scheduler.note_frame(presented)
+                if presented and self.time_to_first_frame is None:
+                    self.time_to_first_frame = time.perf_counter() - self.start_time
+                    if self.first_frame_only:
+                        print(f'time to first frame: {self.time_to_first_frame * 1000:.1f} ms')
+                        return
+                    AUDIO.init()  # start the mixer and decode the sounds once something is on screen
+                AUDIO.end_frame()
+                self.dt = await self.scheduler.wait(self.manager.animating)
+                # print(self.clock.get_fps())
+        finally:
+            if self.report_pacing:
+                print(self.scheduler.pacer.report())
+                print(self.latency.report())
@@ -1,6 +1,17 @@
+import time
+
+START_TIME = time.perf_counter()  # before any other import, for time to first frame
+
 import asyncio
+import sys
 
+from config import PIPELINED_RENDERING, PACING
 from game import Game
 
 if __name__ == '__main__':
-    asyncio.run(Game().run())
+    # --pipelined / --single-threaded override PIPELINED_RENDERING
+    pipelined = ('--pipelined' in sys.argv or PIPELINED_RENDERING) and '--single-threaded' not in sys.argv
+    # --pacing=tick|busy|hybrid overrides PACING, --pacing-report prints jitter and latency histograms on quit
+    pacing = next((i.split('=', 1)[1] for i in sys.argv if i.startswith('--pacing=')), PACING)
+    asyncio.run(Game(start_time=START_TIME, first_frame_only='--first-frame' in sys.argv, pipelined=pipelined,
+                     pacing=pacing, report_pacing='--pacing-report' in sys.argv).run())
@@ -1,31 +1,106 @@
 import math
 import random
-from operator import attrgetter
+from bisect import insort
 from typing import Union, Optional, Callable
 from random import choice, seed
 
 import pygame
 
+from ai import AIScheduler
+from atlas import frame, looping_sheet
+from audio import AUDIO
+from collision import bounds, get_mask, overlap
+from controls import INPUT
+from events import EventsManager, BugDestroyedEvent
+from patterns import AimedBurst, BulletField, Pattern, Ring, Spiral
+from quality import QUALITY
+from render import draw_rect
 from utils import *
 
 
 class BaseObject:
+    # update only every n-th frame while off-screen, with the accumulated dt
+    offscreen_update_interval = 1
+    uses_ai = False  # scheduled by the ObjectManager's AIScheduler, see use_ai
+
     def __init__(self, x=0, y=0):
         self.x, self.y = x, y
+        self._rect = pygame.Rect(0, 0, 0, 0)  # kept centered on (x, y) by move / teleport
+        self._rect.center = (x, y)
         self.alive = True
-        self.z = 0  # for sorting
+        self._z = 0  # draw layer
+        self._layer_z = None  # z of the ObjectManager layer the object sits in
         self.object_manager: Union[ObjectManager, None] = None
+        self._angle = 0
+        self.direction = direction_vector(0)  # unit vector along angle, updated by the angle setter
+        self.visible = True  # set by ObjectManager.draw, False while culled
+        self._pending_dt = 0  # time accumulated over skipped off-screen updates
+        self._skipped_updates = 0
+
+    @property
+    def z(self):
+        return self._z
+
+    @z.setter
+    def z(self, z):
+        if z != self._z:
+            self._z = z
+            if self._layer_z is not None:
+                self.object_manager.move_layer(self)
+
+    @property
+    def angle(self):
+        return self._angle
+
+    @angle.setter
+    def angle(self, angle):
+        if angle != self._angle:
+            self._angle = angle
+            self.direction = direction_vector(angle)
 
     @property
     def rect(self) -> pygame.Rect:
-        raise NotImplementedError
+        return self._rect
+
+    def set_rect_size(self, size, inflate=(0, 0)):
+        # call whenever the sprite (and so the size of the object) changes
+        self._rect.size = (size[0] + inflate[0], size[1] + inflate[1])
+        self._rect.center = (self.x, self.y)
+
+    def move(self, dx, dy):
+        self.x += dx
+        self.y += dy
+        self._rect.center = (self.x, self.y)
+
+    def teleport(self, x, y):
+        self.x, self.y = x, y
+        self._rect.center = (x, y)
+
+    @property
+    def mask_image(self) -> Optional[pygame.Surface]:
+        # current sprite frame for pixel perfect collisions, None to collide by rect
+        return None
+
+    @property
+    def mask_angle(self):
+        return 0
+
+    @property
+    def draw_bounds(self) -> pygame.Rect:
+        # area touched by draw, objects outside the viewport are not drawn
+        return bounds(self)
 
-    def update(self, events: list[pygame.event.Event]):
+    def update(self, events: list[pygame.event.Event], dt=1 / FPS):
+        pass
+
+    def on_hit(self, other: 'BaseObject', overlap_count=0):
+        # called by the ObjectManager collision phase
         pass
 
     def adjust_pos(self):
-        self.x = clamp(self.x, VIEWPORT_RECT.left + self.rect.w // 2, VIEWPORT_RECT.right - self.rect.w // 2)
-        self.y = clamp(self.y, VIEWPORT_RECT.top + self.rect.h // 2, VIEWPORT_RECT.bottom - self.rect.h // 2)
+        rect = self._rect
+        self.teleport(clamp(self.x, VIEWPORT_RECT.left + rect.w // 2, VIEWPORT_RECT.right - rect.w // 2),
+                      clamp(self.y, VIEWPORT_RECT.top + rect.h // 2, VIEWPORT_RECT.bottom - rect.h // 2))
 
     def draw(self, surf: pygame.Surface):
         pass
@@ -62,7 +137,7 @@ class AppearSprite(BaseObject):
         self.surf.blit(self.sprite, pos)
         return self.surf
 
-    def update(self, events: list[pygame.event.Event]):
+    def update(self, events: list[pygame.event.Event], dt=1 / FPS):
         if self.timer.tick:
             self.c_v += self.speed
             self.c_x += self.speed
@@ -96,33 +171,34 @@ class Player(BaseObject):
 
     intermission_config = {
         0: {
-            'vel': 6,
+            'vel': 360,  # pixels per second
             'bullet_timer': 0.2,
         },
 
         1: {
-            'vel': 10,
+            'vel': 600,
             'bullet_timer': 0.15,
         },
 
         2: {
-            'vel': 15,
+            'vel': 900,
             'bullet_timer': 0.1,
         }
     }
 
+    movement_mask = INPUT.mask(*control_mappings)
+
     TOTAL_LIVES = 3
 
     def __init__(self, x=WIDTH // 2, y=HEIGHT // 2, intermission=0):
-        super().__init__()
+        super().__init__(x, y)
         intermission_config = self.intermission_config[intermission]
-        self.x = x
-        self.y = y
         self.vel = intermission_config['vel']
         self.bullet_timer = Timer(intermission_config['bullet_timer'], reset=False)
         self.dir = 'up'
-        self.sheet = LoopingSpriteSheet(get_path('assets', 'images', 'player_sheet_2.png'), 1, 3, 3, True, 3, timer=0.1)
-        self.image = load_image(get_path('assets', 'images', 'player.png'), scale=2, color_key='white')
+        self.sheet = looping_sheet('player', timer=0.1)
+        self.set_rect_size(self.sheet.image.get_size(), inflate=(-30, -30))
+        self.image = frame('player_ship/0')
         self.c = 0
         self.color_timer = Timer(0.1)
         self.color_flag = True
@@ -138,42 +214,47 @@ class Player(BaseObject):
         self.is_playing = True
 
     @property
-    def rect(self):
-        return self.sheet.image.get_rect(center=(self.x, self.y)).inflate(-30, -30)
+    def mask_image(self):
+        return self.sheet.image
+
+    @property
+    def mask_angle(self):
+        return self.angle - 90
 
     def set_intermission_config(self, intermission):
         intermission_config = self.intermission_config[intermission]
         self.vel = intermission_config['vel']
         self.bullet_timer = Timer(intermission_config['bullet_timer'], reset=False)
 
-    def update(self, events: list[pygame.event.Event]):
-        self.scale *= 0.9
+    def update(self, events: list[pygame.event.Event], dt=1 / FPS):
+        decay = 0.9 ** (dt * FPS)  # 0.9 per frame at the nominal frame rate
+        self.scale *= decay
         self.scale = clamp(self.scale, 1, 2)
-        self.recoil_scale *= 0.9
+        self.recoil_scale *= decay
         self.recoil_scale = clamp(self.recoil_scale, 0, 2)
-        keys = pygame.key.get_pressed()
         if not self.alive:
             return
         self.moving = False
         if self.is_playing:
-            for e in events:
-                if e.type == pygame.KEYDOWN:
-                    for _dir, key in self.control_mappings.items():
-                        if e.key == key:
-                            self.dir = _dir
-                if e.type == pygame.KEYUP:
-                    for _dir, key in self.control_mappings.items():
-                        if keys[key] and key != e.key:
-                            self.dir = _dir
+            # replayed in event order, so a press and release within one frame resolve like they happened
+            for pressed, _dir in INPUT.action_events:
+                if _dir not in self.control_mappings:
+                    continue
+                if pressed:
+                    self.dir = _dir
+                elif _dir == self.dir:
+                    # the current direction was released, fall back to a direction that is still held
+                    for held in self.control_mappings:
+                        if INPUT.action_pressed(held):
+                            self.dir = held
             vec = self.vec_mappings[self.dir]
         else:
             vec = [0, 0]
 
         self.angle = 90
 
-        if any(keys[i] for i in [pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT]):
-            self.x += self.vel * vec[0]
-            self.y += self.vel * vec[1]
+        if INPUT.any_pressed(self.movement_mask):
+            self.move(self.vel * vec[0] * dt, self.vel * vec[1] * dt)
             self.adjust_pos()
             self.moving = True
 
@@ -184,13 +265,14 @@ class Player(BaseObject):
 
     def destroy(self):
         self.alive = False
+        AUDIO.play('player_destroyed')
         self.object_manager.add(
             Explosion(self.x,
                       self.y,
                       ('#511309', 'black', '#55241b', '#45283c'),
                       diff=45,
                       particles_per_line=15,
-                      rate=5,
+                      rate=300,
                       max_particle_size=7
                       )
         )
@@ -202,6 +284,7 @@ class Player(BaseObject):
     def launch(self):
         self.bullet_timer.reset()
         self.object_manager.add(PlayerBullet(self.x, self.y, 'up', 0))
+        AUDIO.play('shot')
         self.scale = 1.0
         self.recoil_scale = 1.5
 
@@ -218,52 +301,65 @@ class Player(BaseObject):
 
 
 class Bug(BaseObject):
+    VEL = 60  # pixels per second
+    LOOKAHEAD = 200  # pixels below the bug its steering target is placed
+    offscreen_update_interval = 3
+    uses_ai = True
+
     def __init__(self, x, y):
         super().__init__(x, y)
-        self.sheet = LoopingSpriteSheet(get_path('assets', 'images', 'minibug_sheet.png'), 1, 3, 3, True, 2, timer=0.2)
+        self.sheet = looping_sheet('minibug', timer=0.2, phase=random.randrange(3))
+        self.set_rect_size(self.sheet.image.get_size(), inflate=(-15, -15))
         self.appear_sprite = AppearSprite(pygame.transform.rotate(self.sheet.image, 180), vec=(0, -1), timer=0.05)
         # self.image = load_image(get_path('assets', 'images', 'bug1.png'), scale=2, color_key='white')
         self.angle = 270
-        self.vel = 1
+        self.vel = self.VEL
         self.angle_timer = Timer(2)
-
-    @property
-    def rect(self) -> pygame.Rect:
-        return self.sheet.image.get_rect(center=(self.x, self.y)).inflate(-15, -15)
+        self.target = None  # point the AI scheduler steers towards
 
     def use_ai(self):
-        return
-        # if self.angle_timer.tick:
-        #     self.angle = random.choice(range(0, 360, 90))
+        # decision step, called by the AI scheduler at a rate depending on the distance to the player,
+        # the scheduler turns the bug towards its target every frame. Bugs keep flying straight down for now,
+        # steering towards the player changes the balance of the waves
+        if not self.appear_sprite.done:
+            return
+        self.target = (self.x, self.y + self.LOOKAHEAD)
 
-    def destroy(self):
+    def destroy(self, cause=None, overlap_count=0):
         self.alive = False
+        AUDIO.play('explosion')
         self.object_manager.add(
             Explosion(self.x, self.y, ('red', 'black'))
         )
+        self.object_manager.events.post(BugDestroyedEvent(bug=self, x=self.x, y=self.y, cause=cause, overlap=overlap_count))
+
+    @property
+    def mask_image(self):
+        return self.sheet.image
+
+    @property
+    def mask_angle(self):
+        return self.angle - 90
+
+    def on_hit(self, other: BaseObject, overlap_count=0):
+        if isinstance(other, PlayerBullet):
+            self.destroy('bullet', overlap_count)
 
-    def update(self, events: list[pygame.event.Event]):
-        for i in self.object_manager.objects:
-            if isinstance(i, PlayerBullet):
-                if i.rect.colliderect(self.rect):
-                    i.alive = False
-                    self.destroy()
-                    return
-        self.use_ai()
+    def update(self, events: list[pygame.event.Event], dt=1 / FPS):
         if self.appear_sprite.done:
-            dx = math.cos(math.radians(self.angle)) * self.vel
-            dy = -math.sin(math.radians(self.angle)) * self.vel
-            self.x += dx
-            self.y += dy
+            dx = self.direction[0] * self.vel * dt
+            dy = self.direction[1] * self.vel * dt
+            self.move(dx, dy)
             if not SCREEN_COLLISION_RECT.colliderect(self.rect):
                 self.alive = False
         if self.rect.bottom > SCREEN_RECT.bottom + 10:
-            self.destroy()
+            self.destroy('escaped')
             self.object_manager.player.destroy()
-        if self.rect.colliderect(self.object_manager.player.rect):
-            self.destroy()
+        hit = overlap(self, self.object_manager.player)
+        if hit:
+            self.destroy('player', hit)
             self.object_manager.player.destroy()
-        self.appear_sprite.update(events)
+        self.appear_sprite.update(events, dt)
         # self.adjust_pos()
 
     def draw(self, surf: pygame.Surface):
@@ -285,8 +381,9 @@ class BugHole(BaseObject):
         super().__init__(x, y)
         # if self.surf is None:
         #     BugHole.surf = load_image(get_path('assets', 'images', 'bug_hole.png'), scale=2)
-        self.surf = load_image(get_path('assets', 'images', 'bug_hole.png'), scale=2)
+        self.surf = frame('bug_hole/0').copy()  # scrolled in place, so each hole needs its own copy
         self.appear_sprite = AppearSprite(self.surf, vec=(0, 1), timer=0.05, speed=5)
+        self.set_rect_size(self.surf.get_size())
         self.c = 0
         self.surf.scroll(0, self.surf.get_height())
         self.scroll_timer = Timer(0.1)
@@ -304,7 +401,7 @@ class BugHole(BaseObject):
         self.destroy_bugs()
 
     def resume(self):
-        self.set_vel(1)
+        self.set_vel(Bug.VEL)
         self.start_spawn()
 
     def spawn(self, bug_type: type):
@@ -318,6 +415,7 @@ class BugHole(BaseObject):
             bug = bug_type(self.x, self.y + self.surf.get_height() // 2)
             self.object_manager.add(bug)
             self.bugs.append(bug)
+            AUDIO.play('spawn')
             self.bug_count += 1
 
     def spawn_done(self):
@@ -342,10 +440,6 @@ class BugHole(BaseObject):
     def stop_spawn(self):
         self.spawn_bugs = False
 
-    @property
-    def rect(self) -> pygame.Rect:
-        return self.appear_sprite.image.get_rect(center=(self.x, self.y))
-
     @property
     def image(self):
         return self.appear_sprite.image
@@ -353,13 +447,13 @@ class BugHole(BaseObject):
         # img.scroll(0, self.c)
         # return img
 
-    def update(self, events: list[pygame.event.Event]):
-        self.appear_sprite.update(events)
+    def update(self, events: list[pygame.event.Event], dt=1 / FPS):
+        self.appear_sprite.update(events, dt)
         self.bugs = [i for i in self.bugs if i.alive]
         if self.destroy_all_bugs_in_col:
             if self.destroy_timer.tick:
                 if self.bugs:
-                    self.bugs.pop().destroy()
+                    self.bugs.pop().destroy('cleared')
                 else:
                     self.destroy_all_bugs_in_col = False
         # k = self.k
@@ -376,27 +470,63 @@ class BugHole(BaseObject):
 
 
 class Boss(BaseObject):
+    # not spawned by any scene yet, the boss has no health and can't be hit
+    _bullet_image = None
+
     def __init__(self, x, y):
         super().__init__(x, y)
-        self.sheet = LoopingSpriteSheet(get_path('assets', 'images', 'boss1.png'), 1, 3, 3, True, 2, timer=0.2)
+        self.sheet = looping_sheet('boss', timer=0.2)
+        self.set_rect_size(self.sheet.image.get_size(), inflate=(-5, -5))
         # self.image = load_image(get_path('assets', 'images', 'bug1.png'), scale=2, color_key='white')
         self.angle = 270
         self.vel = 0
         self.angle_timer = Timer(2)
+        self.pattern = Pattern([
+            Ring(count=24, speed=180, interval=1.2, rotation=7.5),
+            Spiral(arms=4, speed=220, interval=0.08, spin=11, start=2, stop=8),
+            AimedBurst(count=5, speed=320, interval=0.9, spread=40, start=4),
+        ], duration=10)
+        # bullet patterns need numpy, without it the boss just doesn't shoot
+        self.bullets = BulletField(self.bullet_image()) if get_numpy() is not None else None
+
+    @classmethod
+    def bullet_image(cls):
+        if cls._bullet_image is None:
+            image = frame('bullet/0').copy()
+            image.fill((255, 70, 70), special_flags=pygame.BLEND_RGB_MULT)
+            cls._bullet_image = image
+        return cls._bullet_image
 
     @property
-    def rect(self) -> pygame.Rect:
-        return self.sheet.image.get_rect().inflate(-5, -5)
+    def draw_bounds(self) -> pygame.Rect:
+        if self.bullets:
+            return SCREEN_RECT
+        return bounds(self)
 
-    def update(self, events: list[pygame.event.Event]):
-        dx = math.cos(math.radians(self.angle)) * self.vel
-        dy = -math.sin(math.radians(self.angle)) * self.vel
-        self.x += dx
-        self.y += dy
+    @property
+    def mask_image(self):
+        return self.sheet.image
+
+    @property
+    def mask_angle(self):
+        return self.angle - 90
+
+    def update(self, events: list[pygame.event.Event], dt=1 / FPS):
+        dx = self.direction[0] * self.vel * dt
+        dy = self.direction[1] * self.vel * dt
+        self.move(dx, dy)
         self.adjust_pos()
+        if self.bullets is not None:
+            player = self.object_manager.player
+            self.pattern.update(dt, self.x, self.y, (player.x, player.y), self.bullets)
+            self.bullets.update(dt)
+            if player.alive and self.bullets.hit_test(player.rect):
+                player.destroy()
 
     def draw(self, surf: pygame.Surface):
         self.sheet.draw(surf, self.x, self.y, self.angle - 90)
+        if self.bullets is not None:
+            self.bullets.draw(surf)
         # s = pygame.transform.rotate(self.image, self.angle - 90)
         # if self.alive:
         #     surf.blit(s, s.get_rect(center=(self.x, self.y)))
@@ -407,9 +537,7 @@ class PlayerBullet(BaseObject):
     _image = None
 
     def __init__(self, x, y, _dir=None, vel_add=0):
-        super().__init__()
-        self.x = x
-        self.y = y
+        super().__init__(x, y)
         if _dir is not None:
             self.dx, self.dy = Player.vec_mappings[_dir]
             if vel_add != 0:
@@ -419,36 +547,67 @@ class PlayerBullet(BaseObject):
             self.dx, self.dy = self.dir
         self.angle = Player.angle_mappings[_dir]
         # print(self.dx, self.dy, 'yooo')
-        self.vel = 10
+        self.vel = 600  # pixels per second
         self.alive = True
         self.length = 20
         if self._image is None:
-            self._image = load_image(get_path('assets', 'images', 'bullet1.png'), True, 2)
+            PlayerBullet._image = frame('bullet/0')  # shared by all bullets
+        self.set_rect_size(get_mask(self._image, self.angle - 90).get_size())
 
     @property
     def image(self):
         return pygame.transform.rotate(self._image, self.angle - 90)
 
     @property
-    def rect(self) -> pygame.Rect:
-        return self.image.get_rect(center=(self.x, self.y))
+    def mask_image(self):
+        return self._image
 
-    def update(self, events: list[pygame.event.Event]):
+    @property
+    def mask_angle(self):
+        return self.angle - 90
+
+    def on_hit(self, other: BaseObject, overlap_count=0):
+        self.alive = False
+
+    def update(self, events: list[pygame.event.Event], dt=1 / FPS):
         # print(self.dx, self.dy)
-        self.x += self.dx * self.vel
-        self.y += self.dy * self.vel
+        self.move(self.dx * self.vel * dt, self.dy * self.vel * dt)
         offset = 50
         if self.x > WIDTH + offset or self.x < -offset or self.y > HEIGHT + offset or self.y < -offset:
             self.alive = False
 
     def draw(self, surf: pygame.Surface):
-        image = self.image
-        surf.blit(image, image.get_rect(center=(self.x, self.y)))
+        draw_image(surf, self._image, self.x, self.y, self.angle - 90)
         # pygame.draw.line(surf, (15, 109, 1), (self.x, self.y), (self.x + self.dx * length, self.y + self.dy * length), 5)
 
 
+def particle_bounds(emitter: Union['Explosion', 'EntryAnimationObject']) -> pygame.Rect:
+    # farthest particle is on the last line, at (particles_per_line - 1) * r from the center
+    particles_per_line, _ = QUALITY.particles(emitter.particles_per_line, emitter.diff)
+    reach = (particles_per_line - 1) * emitter.r * (1 + max(abs(emitter.vec[0]), abs(emitter.vec[1])))
+    size = int(reach) * 2 + emitter.max_particle_size * 2
+    return pygame.Rect(0, 0, size, size).move(emitter.x - size // 2, emitter.y - size // 2)
+
+
+def draw_particles(surf: pygame.Surface, emitter: Union['Explosion', 'EntryAnimationObject']):
+    # particles outside the surface are dropped here instead of being submitted
+    viewport = surf.get_rect()
+    particles_per_line, diff = QUALITY.particles(emitter.particles_per_line, emitter.diff)
+    r, vec, colors = emitter.r, emitter.vec, emitter.colors
+    for i in range(0, 360, diff):
+        color = colors[int(map_to_range(i, 0, 360, 0, len(colors)))]
+        dx, dy = math.cos(math.radians(i)), math.sin(math.radians(i))
+        for k in range(1, particles_per_line):
+            x = k * r * dx + r * k * vec[0]
+            y = k * r * dy + r * k * vec[1]
+            size = emitter.max_particle_size - k
+            rect = pygame.Rect(emitter.x + x, emitter.y + y, size, size)
+            if viewport.colliderect(rect):
+                draw_rect(surf, color, rect)
+
+
 class Explosion(BaseObject):
-    def __init__(self, x, y, colors, vec=(0, 0), diff=45, particles_per_line=3, rate=5, max_particle_size=5):
+    def __init__(self, x, y, colors, vec=(0, 0), diff=45, particles_per_line=3, rate=300, max_particle_size=5):
         super().__init__(x, y)
         self.colors = colors
         self.r = 0
@@ -462,27 +621,23 @@ class Explosion(BaseObject):
     def rect(self) -> pygame.Rect:
         return pygame.Rect(0, 0, 10, 10)
 
-    def update(self, events: list[pygame.event.Event]):
-        self.r += self.rate
+    def update(self, events: list[pygame.event.Event], dt=1 / FPS):
+        self.r += self.rate * dt
         if self.r > 200:
             self.r = 200
             self.alive = False
 
+    @property
+    def draw_bounds(self) -> pygame.Rect:
+        return particle_bounds(self)
+
     def draw(self, surf: pygame.Surface):
         # pygame.draw.rect(surf, 'white', (0, 0, 100, 100))
-        draw_rect = pygame.draw.rect
-        for i in range(0, 360, self.diff):
-            for k in range(1, self.particles_per_line):
-                x = k * self.r * math.cos(math.radians(i)) + self.r * k * self.vec[0]
-                y = k * self.r * math.sin(math.radians(i)) + self.r * k * self.vec[1]
-                color = self.colors[int(map_to_range(i, 0, 360, 0, len(self.colors)))]
-                rect = (self.x + x, self.y + y, self.max_particle_size - k, self.max_particle_size - k)
-                draw_rect(surf, color, rect)
-                # draw_rect(surf, 'black', rect, 2)
+        draw_particles(surf, self)
 
 
 class EntryAnimationObject(BaseObject):
-    def __init__(self, x, y, colors, callback: Callable, vec=(0, 0), diff=45, particles_per_line=3, rate=5, max_particle_size=5):
+    def __init__(self, x, y, colors, callback: Callable, vec=(0, 0), diff=45, particles_per_line=3, rate=300, max_particle_size=5):
         super().__init__(x, y)
         self.colors = colors
         self.r = 200
@@ -497,8 +652,8 @@ class EntryAnimationObject(BaseObject):
     def rect(self) -> pygame.Rect:
         return pygame.Rect(0, 0, 10, 10)
 
-    def update(self, events: list[pygame.event.Event]):
-        self.r -= self.rate
+    def update(self, events: list[pygame.event.Event], dt=1 / FPS):
+        self.r -= self.rate * dt
         if self.r < 0:
             self.r = 0
             self.callback()
@@ -508,24 +663,39 @@ class EntryAnimationObject(BaseObject):
             #     self.object_type.alive = True
             self.alive = False
 
+    @property
+    def draw_bounds(self) -> pygame.Rect:
+        return particle_bounds(self)
+
     def draw(self, surf: pygame.Surface):
         # pygame.draw.rect(surf, 'white', (0, 0, 100, 100))
-        draw_rect = pygame.draw.rect
-        for i in range(0, 360, self.diff):
-            for k in range(1, self.particles_per_line):
-                x = k * self.r * math.cos(math.radians(i)) + self.r * k * self.vec[0]
-                y = k * self.r * math.sin(math.radians(i)) + self.r * k * self.vec[1]
-                color = self.colors[int(map_to_range(i, 0, 360, 0, len(self.colors)))]
-                rect = (self.x + x, self.y + y, self.max_particle_size - k, self.max_particle_size - k)
-                draw_rect(surf, color, rect)
-                # draw_rect(surf, 'black', rect, 2)
+        draw_particles(surf, self)
 
 
 class ObjectManager:
-    def __init__(self):
+    """
+    Keeps objects in insertion order for updating and in one bucket per z layer for drawing,
+    both in the order objects were added. Dead objects are removed and z changes are applied
+    once per frame outside the update and draw passes, so no list changes while it is iterated
+
+    update_order / draw_order can be 'insertion' or 'z'
+    """
+
+    def __init__(self, update_order='insertion', draw_order='z'):
         self.objects: list[BaseObject] = []
         self._to_add: list[BaseObject] = []
+        self.layers: dict[int, list[BaseObject]] = {}
+        self._layer_keys: list[int] = []  # sorted z values of all layers
+        self._moved: dict[BaseObject, None] = {}  # objects whose z changed, in order
+        self.update_order = update_order
+        self.draw_order = draw_order
         self.collision_enabled = True
+        self.events = EventsManager(overflow='grow')  # bus for game objects to talk to each other
+        self.ai = AIScheduler()
+        # per frame counters for profiling
+        self.drawn = 0
+        self.culled = 0
+        self.skipped_updates = 0
         self.player = Player()
         self.player.object_manager = self
 
@@ -538,7 +708,57 @@ class ObjectManager:
 
     def clear(self):
         self._to_add.clear()
+        self._moved.clear()
+        for i in self.objects:
+            i._layer_z = None
         self.objects.clear()
+        self.layers.clear()
+        self._layer_keys.clear()
+        self.events.clear()
+        self.ai.clear()
+
+    def _layer_insert(self, _object: BaseObject):
+        layer = self.layers.get(_object.z)
+        if layer is None:
+            layer = self.layers[_object.z] = []
+            insort(self._layer_keys, _object.z)
+        _object._layer_z = _object.z
+        layer.append(_object)
+
+    def _insert(self, _object: BaseObject):
+        self.objects.append(_object)
+        self._layer_insert(_object)
+        if _object.uses_ai:
+            self.ai.add(_object)
+
+    def _remove_dead(self):
+        # filtering keeps insertion order and the order within every layer
+        objects = self.objects
+        alive = [i for i in objects if i.alive]
+        if len(alive) == len(objects):
+            return
+        for i in objects:
+            if not i.alive:
+                i._layer_z = None
+        objects[:] = alive
+        for layer in self.layers.values():
+            layer[:] = [i for i in layer if i.alive]
+
+    def move_layer(self, _object: BaseObject):
+        # called by the z setter of objects already in a layer, applied by _apply_moves
+        self._moved[_object] = None
+
+    def _apply_moves(self):
+        for i in self._moved:
+            if i._layer_z is not None and i._layer_z != i.z:
+                self.layers[i._layer_z].remove(i)
+                self._layer_insert(i)
+        self._moved.clear()
+
+    def iter_layers(self):
+        layers = self.layers
+        for z in self._layer_keys:
+            yield from layers[z]
 
     def add(self, _object: BaseObject):
         _object.object_manager = self
@@ -548,18 +768,66 @@ class ObjectManager:
         for i in _objects:
             self.add(i)
 
-    def update(self, events: list[pygame.event.Event]):
-        self.player.update(events)
+    def update(self, events: list[pygame.event.Event], dt=1 / FPS):
+        self.player.update(events, dt)
         if self._to_add:
-            self.objects.extend(self._to_add)
+            for i in self._to_add:
+                self._insert(i)
             self._to_add.clear()
-        self.objects = [i for i in self.objects if i.alive]
-        self.objects.sort(key=attrgetter('z'))
-        for i in self.objects:
-            i.update(events)
+        self._apply_moves()
+        self._remove_dead()
+        self.ai.update(dt, self.player)
+        objects = self.iter_layers() if self.update_order == 'z' else self.objects
+        skipped = 0
+        for i in objects:
+            if i.offscreen_update_interval > 1:
+                # culled objects that opted in are updated less often, events of skipped frames are dropped
+                i._pending_dt += dt
+                if not i.visible and i._skipped_updates + 1 < i.offscreen_update_interval:
+                    i._skipped_updates += 1
+                    skipped += 1
+                    continue
+                step, i._pending_dt, i._skipped_updates = i._pending_dt, 0, 0
+                i.update(events, step)
+            else:
+                i.update(events, dt)
+        self.skipped_updates = skipped
+        self._apply_moves()
+        if self.collision_enabled:
+            self.handle_collisions()
+        self.events.process_all_events()
+
+    def handle_collisions(self):
+        # runs once per frame after movement, bullet rects are gathered once and tested in C
+        bullets = [i for i in self.objects if isinstance(i, PlayerBullet) and i.alive]
+        if not bullets:
+            return
+        bullet_rects = [bounds(i) for i in bullets]
+        for bug in self.objects:
+            if not isinstance(bug, Bug) or not bug.alive:
+                continue
+            for index in bounds(bug).collidelistall(bullet_rects):
+                bullet = bullets[index]
+                if not bullet.alive:
+                    continue
+                hit = overlap(bullet, bug)
+                if hit:
+                    bullet.on_hit(bug, hit)
+                    bug.on_hit(bullet, hit)
+                    break
 
     def draw(self, surf: pygame.Surface):
-        for i in self.objects:
-            i.draw(surf)
+        objects = self.iter_layers() if self.draw_order == 'z' else self.objects
+        viewport = surf.get_rect()
+        drawn = culled = 0
+        for i in objects:
+            if viewport.colliderect(i.draw_bounds):
+                i.visible = True
+                i.draw(surf)
+                drawn += 1
+            else:
+                i.visible = False
+                culled += 1
+        self.drawn, self.culled = drawn, culled
         self.player.draw(surf)
         # pygame.draw.rect(surf, 'black', self.player.rect, 2)
@@ -0,0 +1,135 @@
+import time
+from collections import deque
+
+import pygame
+
+from config import FPS, PACING, PACING_SPIN_MARGIN
+
+LATENCY_BUCKETS = (4, 8, 12, 16, 20, 25, 33, 50, 66, 100)  # ms, upper bounds
+JITTER_BUCKETS = (0.25, 0.5, 1, 2, 4, 8, 16)  # ms off the target frame time
+
+INPUT_EVENTS = (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN)
+
+
+def histogram(samples, buckets) -> list[tuple[str, int]]:
+    counts = [0] * (len(buckets) + 1)
+    for sample in samples:
+        for index, bound in enumerate(buckets):
+            if sample <= bound:
+                counts[index] += 1
+                break
+        else:
+            counts[-1] += 1
+    labels = [f'<= {i:g}' for i in buckets] + [f'> {buckets[-1]:g}']
+    return list(zip(labels, counts))
+
+
+def format_histogram(title, samples, buckets, width=40):
+    if not samples:
+        return f'{title}: no samples'
+    ordered = sorted(samples)
+    lines = [f'{title}: {len(ordered)} samples, mean {sum(ordered) / len(ordered):.2f} ms, '
+             f'p50 {ordered[len(ordered) // 2]:.2f} ms, p99 {ordered[int(len(ordered) * 0.99)]:.2f} ms, '
+             f'max {ordered[-1]:.2f} ms']
+    top = max(count for _, count in histogram(ordered, buckets)) or 1
+    for label, count in histogram(ordered, buckets):
+        lines.append(f'  {label:>8} ms {count:6d} {"#" * round(count / top * width)}')
+    return '\n'.join(lines)
+
+
+class FramePacer:
+    """
+    Waits for the next frame with one of these strategies
+
+    tick - pygame.time.Clock.tick, sleeps, cheap but wakes up late by up to a scheduler quantum
+    busy - Clock.tick_busy_loop, spins for the whole wait, precise but burns a core
+    hybrid - sleeps until `spin_margin` seconds before the deadline, then spins
+
+    The interval between frames is recorded so strategies can be compared by their jitter
+    """
+
+    STRATEGIES = ('tick', 'busy', 'hybrid')
+
+    def __init__(self, fps=FPS, strategy=PACING, spin_margin=PACING_SPIN_MARGIN, samples=3600):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f'unknown pacing strategy {strategy!r}, expected one of {self.STRATEGIES}')
+        self.fps = fps
+        self.strategy = strategy
+        self.spin_margin = spin_margin
+        self.clock = pygame.time.Clock()
+        self.intervals: deque[float] = deque(maxlen=samples)  # ms between paced frames
+        self._last = time.perf_counter()
+
+    def wait(self, fps=None, record=True) -> float:
+        """Waits for the next frame and returns the seconds since the previous one, fps 0 doesn't wait"""
+        fps = self.fps if fps is None else fps
+        if self.strategy == 'hybrid':
+            self._wait_hybrid(fps)
+            self.clock.tick()  # keeps get_fps working
+        elif self.strategy == 'busy':
+            self.clock.tick_busy_loop(fps)
+        else:
+            self.clock.tick(fps)
+        now = time.perf_counter()
+        dt = now - self._last
+        self._last = now
+        if record and fps:
+            self.intervals.append(dt * 1000)
+        return dt
+
+    def _wait_hybrid(self, fps):
+        if not fps:
+            return
+        deadline = self._last + 1 / fps
+        remaining = deadline - time.perf_counter()
+        if remaining > self.spin_margin:
+            time.sleep(remaining - self.spin_margin)
+        while time.perf_counter() < deadline:
+            pass
+
+    @property
+    def jitter(self) -> list[float]:
+        target = 1000 / self.fps
+        return [abs(i - target) for i in self.intervals]
+
+    def report(self):
+        return format_histogram(f'frame jitter ({self.strategy}, target {1000 / self.fps:.2f} ms)', self.jitter,
+                                JITTER_BUCKETS)
+
+
+class LatencyTracker:
+    """
+    Input to photon latency as far as the game can see it
+
+    Key and mouse button presses are timestamped when the game loop receives them, and the latency is
+    taken when the first frame recorded after them has been presented. pygame doesn't expose SDL's event
+    timestamps, so the time an event sat in the queue before the loop polled it is not counted and
+    the numbers under-report real latency by up to a frame. Synthetic events can carry their own
+    `timestamp` attribute on the time.perf_counter clock
+    """
+
+    def __init__(self, samples=3600):
+        self.latencies: deque[float] = deque(maxlen=samples)  # ms
+        self._pending: list[float] = []  # arrivals not yet in a recorded frame
+        self._in_flight: deque[tuple[int, list[float]]] = deque()  # (frame, arrivals) recorded but not presented
+
+    def note_events(self, events: list[pygame.event.Event], now=None):
+        now = time.perf_counter() if now is None else now
+        for e in events:
+            if e.type in INPUT_EVENTS:
+                self._pending.append(getattr(e, 'timestamp', now))
+
+    def frame_recorded(self, frame):
+        # the frame being drawn now reflects all input received so far
+        if self._pending:
+            self._in_flight.append((frame, self._pending))
+            self._pending = []
+
+    def frame_presented(self, frame, now=None):
+        now = time.perf_counter() if now is None else now
+        while self._in_flight and self._in_flight[0][0] <= frame:
+            for arrival in self._in_flight.popleft()[1]:
+                self.latencies.append((now - arrival) * 1000)
+
+    def report(self):
+        return format_histogram('input latency', self.latencies, LATENCY_BUCKETS)
@@ -0,0 +1,206 @@
+import math
+import weakref
+
+import pygame
+
+from config import SCREEN_COLLISION_RECT
+from utils import get_numpy
+
+SPRITE_ANGLES = 32  # number of pre-rotated bullet sprites, angles are rounded to the nearest one
+
+# bullet sprite -> its pre-rotated set, shared by every field using that sprite
+_rotations: 'weakref.WeakKeyDictionary[pygame.Surface, list[pygame.Surface]]' = weakref.WeakKeyDictionary()
+
+
+def rotations(image: pygame.Surface) -> list[pygame.Surface]:
+    # index i points along i * 360 / SPRITE_ANGLES degrees, the source image points up
+    try:
+        return _rotations[image]
+    except KeyError:
+        sprites = _rotations[image] = [pygame.transform.rotate(image, i * 360 / SPRITE_ANGLES - 90)
+                                       for i in range(SPRITE_ANGLES)]
+        return sprites
+
+
+class Emitter:
+    """
+    Declarative description of a stream of bullets
+
+    Fires every `interval` seconds between `start` and `stop` (seconds into the pattern),
+    subclasses return the angles of one shot, in degrees with the y axis pointing down
+    """
+
+    def __init__(self, speed, interval, start=0.0, stop=math.inf):
+        self.speed = speed  # pixels per second
+        self.interval = interval
+        self.start = start
+        self.stop = stop
+        self.shots = 0
+        self.next = start
+
+    def reset(self):
+        self.shots = 0
+        self.next = self.start
+
+    def angles(self, x, y, target) -> list[float]:
+        raise NotImplementedError
+
+
+class Ring(Emitter):
+    """`count` bullets evenly around the emitter, every ring turned by `rotation` degrees"""
+
+    def __init__(self, count, speed, interval, rotation=0, start=0.0, stop=math.inf):
+        super().__init__(speed, interval, start, stop)
+        self.count = count
+        self.rotation = rotation
+
+    def angles(self, x, y, target):
+        offset = self.shots * self.rotation
+        return [offset + i * 360 / self.count for i in range(self.count)]
+
+
+class Spiral(Emitter):
+    """`arms` bullets per shot, turning by `spin` degrees after every shot"""
+
+    def __init__(self, arms, speed, interval, spin=10, start=0.0, stop=math.inf):
+        super().__init__(speed, interval, start, stop)
+        self.arms = arms
+        self.spin = spin
+
+    def angles(self, x, y, target):
+        offset = self.shots * self.spin
+        return [offset + i * 360 / self.arms for i in range(self.arms)]
+
+
+class AimedBurst(Emitter):
+    """`count` bullets fanned over `spread` degrees, centered on the target"""
+
+    def __init__(self, count, speed, interval, spread=30, start=0.0, stop=math.inf):
+        super().__init__(speed, interval, start, stop)
+        self.count = count
+        self.spread = spread
+
+    def angles(self, x, y, target):
+        aim = math.degrees(math.atan2(y - target[1], target[0] - x))
+        if self.count == 1:
+            return [aim]
+        step = self.spread / (self.count - 1)
+        return [aim - self.spread / 2 + i * step for i in range(self.count)]
+
+
+class Pattern:
+    """A set of emitters on a shared timeline, restarted every `duration` seconds (0 to never restart)"""
+
+    def __init__(self, emitters: list[Emitter], duration=0.0):
+        self.emitters = emitters
+        self.duration = duration
+        self.time = 0.0
+
+    def reset(self):
+        self.time = 0.0
+        for i in self.emitters:
+            i.reset()
+
+    def update(self, dt, x, y, target, field: 'BulletField'):
+        self.time += dt
+        for emitter in self.emitters:
+            while emitter.next <= self.time and emitter.next < emitter.stop:
+                field.spawn(x, y, emitter.angles(x, y, target), emitter.speed)
+                emitter.shots += 1
+                emitter.next += emitter.interval
+        if self.duration and self.time >= self.duration:
+            self.reset()
+
+
+class BulletField:
+    """
+    All enemy bullets of an encounter, simulated as numpy arrays
+
+    Live bullets are kept packed at the start of the arrays, bullets leaving `bounds`
+    or hitting the player are dropped by compacting the arrays once per update.
+    Each bullet is drawn with the pre-rotated sprite closest to its heading in one blits call
+    """
+
+    def __init__(self, image: pygame.Surface, radius=None, capacity=1024, bounds=SCREEN_COLLISION_RECT):
+        np = get_numpy()
+        if np is None:
+            raise ImportError('numpy is required for bullet patterns')
+        self.np = np
+        self.sprites = rotations(image)
+        self._half_sizes = np.array([(i.get_width() // 2, i.get_height() // 2) for i in self.sprites])
+        self.radius = radius if radius is not None else min(image.get_size()) / 2
+        self.bounds = pygame.Rect(bounds)
+        self.pos = np.empty((capacity, 2))
+        self.vel = np.empty((capacity, 2))
+        self.sprite = np.empty(capacity, dtype=np.intp)
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def _grow(self, size):
+        np = self.np
+        capacity = len(self.pos)
+        while capacity < size:
+            capacity *= 2
+        for name in ('pos', 'vel', 'sprite'):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def spawn(self, x, y, angles, speed):
+        np = self.np
+        angles = np.asarray(angles, dtype=float)
+        start, end = self.count, self.count + len(angles)
+        if end > len(self.pos):
+            self._grow(end)
+        rad = np.radians(angles)
+        self.pos[start:end] = (x, y)
+        self.vel[start:end, 0] = np.cos(rad) * speed
+        self.vel[start:end, 1] = -np.sin(rad) * speed
+        self.sprite[start:end] = np.rint(angles * SPRITE_ANGLES / 360).astype(np.intp) % SPRITE_ANGLES
+        self.count = end
+
+    def _keep(self, keep):
+        count = int(keep.sum())
+        if count == self.count:
+            return
+        for array in (self.pos, self.vel, self.sprite):
+            array[:count] = array[:self.count][keep]
+        self.count = count
+
+    def update(self, dt):
+        if not self.count:
+            return
+        pos = self.pos[:self.count]
+        pos += self.vel[:self.count] * dt
+        bounds = self.bounds
+        x, y = pos[:, 0], pos[:, 1]
+        self._keep((x >= bounds.left) & (x < bounds.right) & (y >= bounds.top) & (y < bounds.bottom))
+
+    def hit_test(self, rect: pygame.Rect) -> int:
+        """Removes bullets whose circle touches rect, returns how many did"""
+        if not self.count:
+            return 0
+        np = self.np
+        pos = self.pos[:self.count]
+        # distance from each bullet center to the closest point of the rect
+        dx = pos[:, 0] - np.clip(pos[:, 0], rect.left, rect.right)
+        dy = pos[:, 1] - np.clip(pos[:, 1], rect.top, rect.bottom)
+        hit = dx * dx + dy * dy <= self.radius * self.radius
+        hits = int(hit.sum())
+        if hits:
+            self._keep(~hit)
+        return hits
+
+    def draw(self, surf: pygame.Surface):
+        if not self.count:
+            return
+        sprite = self.sprite[:self.count]
+        topleft = (self.pos[:self.count] - self._half_sizes[sprite]).astype(int)
+        sprites = self.sprites
+        surf.blits([(sprites[i], p) for i, p in zip(sprite.tolist(), topleft.tolist())], doreturn=False)
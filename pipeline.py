@@ -0,0 +1,66 @@
+import threading
+from typing import Union
+
+import pygame
+
+from render import DrawList
+
+
+class RenderThread:
+    """
+    Rasterizes draw lists on a separate thread
+
+    The game loop records frame N+1 into a new DrawList while this thread replays frame N
+    into the back buffer, pygame releases the GIL in blits and transforms so the two overlap.
+    Presenting stays on the main thread
+    """
+
+    def __init__(self, target: pygame.Surface):
+        self.target = target
+        self._job: Union[DrawList, None] = None
+        self._rendered = False
+        self._condition = threading.Condition()
+        self._running = True
+        self.frames = 0
+        self._thread = threading.Thread(target=self._run, name='render', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._job is None and self._running:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                job = self._job
+            job.replay(self.target)
+            with self._condition:
+                self._job = None
+                self._rendered = True
+                self.frames += 1
+                self._condition.notify_all()
+
+    def wait(self) -> bool:
+        """Block until the submitted frame is in the back buffer, returns False if nothing new was rendered"""
+        with self._condition:
+            while self._job is not None:
+                self._condition.wait()
+            rendered, self._rendered = self._rendered, False
+            return rendered
+
+    def submit(self, draw_list: DrawList):
+        with self._condition:
+            while self._job is not None:
+                self._condition.wait()
+            self._job = draw_list
+            self._condition.notify_all()
+
+    def set_target(self, target: pygame.Surface):
+        # e.g. after toggling full screen, only safe while no frame is in flight (after wait)
+        self.target = target
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        self._thread.join()
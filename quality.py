@@ -0,0 +1,109 @@
+from collections import deque
+
+from config import FPS, QUALITY_GOVERNOR
+
+
+class QualityGovernor:
+    """
+    Lowers or raises the quality tier based on rolling frame times against the frame budget
+
+    A tier is dropped as soon as the average frame time goes over budget, but only raised again
+    after the game has stayed well under budget for a while, so quality doesn't oscillate
+    """
+
+    TIERS = [
+        {
+            'name': 'high',
+            'particle_density': 1.0,  # multiplier for particles per line
+            'particle_spread': 1,  # multiplier for the angle between particle lines
+            'rotation_step': 1,  # sprite angles are rounded to multiples of this
+            'transition_cell': 50,  # size of a transition grid cell
+            'subtitle_effects': True,
+        },
+        {
+            'name': 'medium',
+            'particle_density': 0.6,
+            'particle_spread': 1,
+            'rotation_step': 15,
+            'transition_cell': 75,
+            'subtitle_effects': True,
+        },
+        {
+            'name': 'low',
+            'particle_density': 0.35,
+            'particle_spread': 2,
+            'rotation_step': 45,
+            'transition_cell': 100,
+            'subtitle_effects': False,
+        },
+    ]
+
+    def __init__(self, budget=1 / FPS, window=30, downgrade_ratio=1.0, upgrade_ratio=0.6, upgrade_delay=180, cooldown=60,
+                 enabled=QUALITY_GOVERNOR):
+        self.budget = budget
+        self.window = window
+        self.downgrade_ratio = downgrade_ratio
+        self.upgrade_ratio = upgrade_ratio
+        self.upgrade_delay = upgrade_delay  # frames under budget needed before raising the tier
+        self.cooldown = cooldown  # frames to wait after any change
+        self.enabled = enabled
+        self.tier = 0
+        self._samples = deque(maxlen=window)
+        self._total = 0.0
+        self._since_change = 0
+        self._calm = 0
+        self.changes = 0
+
+    @property
+    def settings(self) -> dict:
+        return self.TIERS[self.tier]
+
+    @property
+    def name(self):
+        return self.settings['name']
+
+    @property
+    def average(self):
+        return self._total / len(self._samples) if self._samples else 0.0
+
+    def set_tier(self, tier):
+        tier = max(0, min(tier, len(self.TIERS) - 1))
+        if tier != self.tier:
+            self.tier = tier
+            self.changes += 1
+        self._since_change = 0
+        self._calm = 0
+
+    def record(self, frame_time):
+        """Feed the time spent working on the last frame (excluding the frame limiter's sleep)"""
+        if not self.enabled:
+            return
+        if len(self._samples) == self._samples.maxlen:
+            self._total -= self._samples[0]
+        self._samples.append(frame_time)
+        self._total += frame_time
+        self._since_change += 1
+        if len(self._samples) < self.window or self._since_change < self.cooldown:
+            return
+        average = self.average
+        if average > self.budget * self.downgrade_ratio:
+            if self.tier < len(self.TIERS) - 1:
+                self.set_tier(self.tier + 1)
+        elif average < self.budget * self.upgrade_ratio:
+            self._calm += 1
+            if self._calm >= self.upgrade_delay and self.tier > 0:
+                self.set_tier(self.tier - 1)
+        else:
+            self._calm = 0
+
+    def particles(self, particles_per_line, diff):
+        # scaled particle emitter parameters for the current tier
+        settings = self.settings
+        return max(2, round(particles_per_line * settings['particle_density'])), int(diff * settings['particle_spread'])
+
+    def quantize_angle(self, angle):
+        step = self.settings['rotation_step']
+        return angle if step <= 1 else round(angle / step) * step
+
+
+QUALITY = QualityGovernor()
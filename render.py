@@ -0,0 +1,313 @@
+import weakref
+from typing import Literal, Union
+
+import pygame
+
+from config import WIDTH, HEIGHT
+from quality import QUALITY
+
+
+def software_draw_image(surf: pygame.Surface, image: pygame.Surface, x, y, angle=0, size=1,
+                        mode: Literal['center', 'topleft'] = 'center'):
+    if size != 1:
+        image = pygame.transform.scale_by(image, size)
+    angle = QUALITY.quantize_angle(angle)
+    if angle != 0:
+        image = pygame.transform.rotate(image, angle)
+    if mode == 'center':
+        surf.blit(image, image.get_rect(center=(x, y)))
+    else:
+        surf.blit(image, (x, y))
+
+
+class DrawList:
+    """
+    Records draw calls instead of rasterizing them, so a frame can be handed to the render thread
+
+    Implements the part of the Surface api the scenes use (blit, fill, sizes),
+    shapes and sprites are recorded through draw_rect / draw_circle / draw_line / draw_image.
+    Surfaces referenced by a draw list must not be changed until it has been replayed
+    """
+
+    def __init__(self, size=(WIDTH, HEIGHT)):
+        self.size = size
+        self.commands = []
+
+    def get_size(self):
+        return self.size
+
+    def get_width(self):
+        return self.size[0]
+
+    def get_height(self):
+        return self.size[1]
+
+    def get_rect(self, **kwargs):
+        rect = pygame.Rect((0, 0), self.size)
+        for attr, value in kwargs.items():
+            setattr(rect, attr, value)
+        return rect
+
+    def fill(self, color, rect=None):
+        self.commands.append(('fill', color, rect))
+        return pygame.Rect(rect) if rect is not None else pygame.Rect((0, 0), self.size)
+
+    def blit(self, source: pygame.Surface, dest, area=None, special_flags=0):
+        self.commands.append(('blit', source, dest, area, special_flags))
+        w, h = (area[2], area[3]) if area is not None else source.get_size()
+        return pygame.Rect(dest[0], dest[1], w, h)
+
+    def blits(self, blit_sequence, doreturn=True):
+        blit_sequence = list(blit_sequence)
+        self.commands.append(('blits', blit_sequence))
+        if doreturn:
+            return [pygame.Rect(dest, source.get_size()) for source, dest, *_ in blit_sequence]
+
+    def image(self, image, x, y, angle=0, size=1, mode: Literal['center', 'topleft'] = 'center'):
+        self.commands.append(('image', image, x, y, angle, size, mode))
+
+    def rect(self, color, rect, width=0):
+        self.commands.append(('rect', color, rect, width))
+
+    def circle(self, color, center, radius, width=0):
+        self.commands.append(('circle', color, center, radius, width))
+
+    def line(self, color, start, end, width=1):
+        self.commands.append(('line', color, start, end, width))
+
+    def replay(self, surf: pygame.Surface):
+        draw_rect, draw_circle, draw_line = pygame.draw.rect, pygame.draw.circle, pygame.draw.line
+        for command in self.commands:
+            op = command[0]
+            if op == 'image':
+                software_draw_image(surf, *command[1:])
+            elif op == 'blit':
+                surf.blit(*command[1:])
+            elif op == 'blits':
+                surf.blits(command[1], doreturn=False)
+            elif op == 'rect':
+                draw_rect(surf, *command[1:])
+            elif op == 'fill':
+                surf.fill(*command[1:])
+            elif op == 'circle':
+                draw_circle(surf, *command[1:])
+            elif op == 'line':
+                draw_line(surf, *command[1:])
+
+
+class RenderBackend:
+    """
+    Sits between the scenes and the screen
+
+    Scenes draw everything onto `surface`, sprites drawn through `draw_image`
+    may be handled by the backend itself (rotated and scaled on the gpu for example)
+    """
+
+    name = 'base'
+
+    def __init__(self, size=(WIDTH, HEIGHT)):
+        self.size = size
+        self.full_screen = False
+        self.surface: Union[pygame.Surface, None] = None
+
+    def begin(self, color):
+        self.surface.fill(color)
+
+    def draw_image(self, image: pygame.Surface, x, y, angle=0, size=1, mode: Literal['center', 'topleft'] = 'center'):
+        software_draw_image(self.surface, image, x, y, angle, size, mode)
+
+    def present(self):
+        raise NotImplementedError
+
+    def toggle_full_screen(self):
+        raise NotImplementedError
+
+
+class SurfaceBackend(RenderBackend):
+    """Software rendering straight to the display surface"""
+
+    name = 'surface'
+
+    def __init__(self, size=(WIDTH, HEIGHT)):
+        super().__init__(size)
+        self.surface = pygame.display.set_mode(self.size)
+
+    def present(self):
+        pygame.display.update()
+
+    def toggle_full_screen(self):
+        self.full_screen = not self.full_screen
+        if self.full_screen:
+            self.surface = pygame.display.set_mode(self.size, pygame.SCALED | pygame.FULLSCREEN)
+        else:
+            self.surface = pygame.display.set_mode(self.size)
+
+
+class OverlaySurface(pygame.Surface):
+    """Transparent software layer of the RendererBackend, tracks the area drawn on since the last flush"""
+
+    dirty_rect: Union[pygame.Rect, None] = None
+
+    def mark(self, rect):
+        rect = self.get_rect().clip(rect)
+        if rect:
+            self.dirty_rect = rect if self.dirty_rect is None else self.dirty_rect.union(rect)
+
+    def blit(self, *args, **kwargs):
+        rect = super().blit(*args, **kwargs)
+        self.mark(rect)
+        return rect
+
+    def blits(self, blit_sequence, doreturn=True):
+        rects = super().blits(blit_sequence)
+        if rects:
+            self.mark(rects[0].unionall(rects[1:]))
+        return rects if doreturn else None
+
+    def fill(self, color, rect=None, special_flags=0):
+        rect = super().fill(color, rect, special_flags)
+        self.mark(rect)
+        return rect
+
+    def clear(self):
+        if self.dirty_rect is not None:
+            super().fill((0, 0, 0, 0), self.dirty_rect)
+            self.dirty_rect = None
+
+
+class RendererBackend(RenderBackend):
+    """
+    pygame._sdl2 Renderer based rendering
+
+    Sprite frames are uploaded once as textures and drawn with rotation and scale by the renderer,
+    everything else is drawn in software onto a transparent overlay. Whenever a sprite is drawn after software draws,
+    only the area drawn on is uploaded to one of a few streaming textures and drawn first,
+    so the draw order is the same as with SurfaceBackend.
+    Pass software=True to use SDL's software renderer on machines without a gpu
+    """
+
+    name = 'renderer'
+    BLEND_MODE = 1  # SDL_BLENDMODE_BLEND
+    OVERLAYS = 2  # streaming textures used in turn, SDL finishes draws of a texture before updating it
+
+    def __init__(self, size=(WIDTH, HEIGHT), title='Bug Invaders', software=False, vsync=False):
+        super().__init__(size)
+        from pygame._sdl2.video import Window, Renderer, Texture
+
+        self._texture_type = Texture
+        self.window = Window(title, self.size)
+        self.renderer = Renderer(self.window, accelerated=0 if software else -1, vsync=vsync)
+        self.renderer.logical_size = self.size
+        self.surface = OverlaySurface(self.size, pygame.SRCALPHA)
+        self._overlays = [Texture(self.renderer, self.size, streaming=True) for _ in range(self.OVERLAYS)]
+        for overlay in self._overlays:
+            overlay.blend_mode = self.BLEND_MODE
+        self._next_overlay = 0
+        self.uploads = 0  # per frame counter
+        self._textures = weakref.WeakKeyDictionary()  # sprite frame -> texture
+
+    def texture(self, image: pygame.Surface):
+        try:
+            return self._textures[image]
+        except KeyError:
+            texture = self._texture_type.from_surface(self.renderer, image)
+            texture.blend_mode = self.BLEND_MODE
+            self._textures[image] = texture
+            return texture
+
+    def begin(self, color):
+        self.renderer.draw_color = pygame.Color(color)
+        self.renderer.clear()
+        self.surface.clear()
+        self.uploads = 0
+
+    def flush(self):
+        """Draws the software drawn overlay so far under whatever comes next"""
+        rect = self.surface.dirty_rect
+        if rect is None:
+            return
+        overlay = self._overlays[self._next_overlay]
+        self._next_overlay = (self._next_overlay + 1) % len(self._overlays)
+        overlay.update(self.surface.subsurface(rect), rect)
+        overlay.draw(srcrect=rect, dstrect=rect)
+        self.surface.clear()
+        self.uploads += 1
+
+    def draw_image(self, image: pygame.Surface, x, y, angle=0, size=1, mode: Literal['center', 'topleft'] = 'center'):
+        rect = pygame.Rect(0, 0, image.get_width() * size, image.get_height() * size)
+        if mode == 'center':
+            rect.center = (x, y)
+        else:
+            rect.topleft = (x, y)
+        self.flush()
+        # sdl rotates clockwise, pygame.transform.rotate counter-clockwise
+        self.texture(image).draw(dstrect=rect, angle=-angle)
+
+    def present(self):
+        self.flush()
+        self.renderer.present()
+
+    def toggle_full_screen(self):
+        self.full_screen = not self.full_screen
+        if self.full_screen:
+            self.window.set_fullscreen(True)
+        else:
+            self.window.set_windowed()
+
+
+BACKENDS = {
+    'surface': SurfaceBackend,
+    'renderer': RendererBackend,
+}
+
+_backend: Union[RenderBackend, None] = None
+
+
+def create_backend(name='surface', **kwargs) -> RenderBackend:
+    global _backend
+    _backend = BACKENDS[name](**kwargs)
+    return _backend
+
+
+def get_backend() -> Union[RenderBackend, None]:
+    return _backend
+
+
+def draw_image(surf: Union[pygame.Surface, DrawList], image: pygame.Surface, x, y, angle=0, size=1,
+               mode: Literal['center', 'topleft'] = 'center'):
+    """Draw a sprite, through the active backend when drawing onto its surface"""
+    if _backend is not None and surf is _backend.surface:
+        _backend.draw_image(image, x, y, angle, size, mode)
+    elif isinstance(surf, DrawList):
+        surf.image(image, x, y, angle, size, mode)
+    else:
+        software_draw_image(surf, image, x, y, angle, size, mode)
+
+
+# pygame.draw counterparts that can also record into a DrawList
+
+def draw_rect(surf: Union[pygame.Surface, DrawList], color, rect, width=0):
+    if isinstance(surf, DrawList):
+        surf.rect(color, rect, width)
+    else:
+        changed = pygame.draw.rect(surf, color, rect, width)
+        if isinstance(surf, OverlaySurface):
+            surf.mark(changed)
+
+
+def draw_circle(surf: Union[pygame.Surface, DrawList], color, center, radius, width=0):
+    if isinstance(surf, DrawList):
+        surf.circle(color, center, radius, width)
+    else:
+        changed = pygame.draw.circle(surf, color, center, radius, width)
+        if isinstance(surf, OverlaySurface):
+            surf.mark(changed)
+
+
+def draw_line(surf: Union[pygame.Surface, DrawList], color, start, end, width=1):
+    if isinstance(surf, DrawList):
+        surf.line(color, start, end, width)
+    else:
+        changed = pygame.draw.line(surf, color, start, end, width)
+        if isinstance(surf, OverlaySurface):
+            surf.mark(changed)
@@ -1,9 +1,19 @@
+import math
+import sys
 import traceback
+from typing import Optional
 
-from objects import *
+import pygame
+
+from atlas import frame, looping_sheet
+from config import WIDTH, HEIGHT, FPS, BG_COlOR, VIEWPORT_RECT
+from controls import INPUT
+from objects import ObjectManager, Bug, BugHole, Explosion, EntryAnimationObject
+from quality import QUALITY
+from render import draw_rect
 from subtitles import SubtitleManager, BlinkingSubtitle, get_typed_subtitles
 from transition import TransitionManager
-from ui import *
+from utils import LoopingSpriteSheet, Timer, clamp, get_time, text
 
 
 def update_error_handle(f):
@@ -14,15 +24,14 @@ def update_error_handle(f):
             obj.raise_error(e)
             print(e)
         if obj.error:
-            for e in events:
-                if e.type == pygame.KEYDOWN:
-                    if e.key == pygame.K_e:
-                        obj.show_traceback = not obj.show_traceback
-                    if e.key == pygame.K_KP_PLUS:
-                        obj.error_size += 5
-                    if e.key == pygame.K_KP_MINUS:
-                        obj.error_size -= 5
-                    obj.error_size = clamp(obj.error_size, 5, 50)
+            for key in INPUT.downs:
+                if key == pygame.K_e:
+                    obj.show_traceback = not obj.show_traceback
+                if key == pygame.K_KP_PLUS:
+                    obj.error_size += 5
+                if key == pygame.K_KP_MINUS:
+                    obj.error_size -= 5
+                obj.error_size = clamp(obj.error_size, 5, 50)
 
     return wrapper
 
@@ -76,6 +85,9 @@ class Scene(metaclass=MetaClass):
     Base signature for all menus
     """
 
+    # False for scenes that look the same every frame until input arrives, lets the game loop idle
+    animating = True
+
     def __init__(self, manager: 'SceneManager', name='menu'):
         self.manager = manager
         self.name = name
@@ -89,7 +101,7 @@ class Scene(metaclass=MetaClass):
     def reset(self):
         self.__init__(self.manager, self.name)
 
-    def update(self, events: list[pygame.event.Event]):
+    def update(self, events: list[pygame.event.Event], dt=1 / FPS):
         pass
 
     def draw(self, surf: pygame.Surface):
@@ -98,6 +110,8 @@ class Scene(metaclass=MetaClass):
 
 
 class UnloadedScene(Scene):
+    animating = False
+
     def draw(self, surf: pygame.Surface):
         surf.fill(BG_COlOR)
         t = text('Unloaded Scene', 100)
@@ -105,18 +119,65 @@ class UnloadedScene(Scene):
 
 
 class IntermissionOneHelpScene(Scene):
+    animating = False
+
     def __init__(self, manager, name):
         super().__init__(manager, name)
         self.surf = pygame.display.get_surface()
 
 
 class WaveOver(Scene):
+    animating = False
+
     def draw(self, surf: pygame.Surface):
         surf.fill(BG_COlOR)
         t = text('WAVE OVER', 100)
         surf.blit(t, t.get_rect(center=(WIDTH // 2, HEIGHT // 2)))
 
 
+class MenuRenderer:
+    """
+    Prerendered main menu
+
+    Title, options (plain and selected) and the bug row (one surface per animation frame)
+    are rendered once, a frame only moves them around and is drawn with a single blits call
+    """
+
+    COLOR = '#511309'
+
+    def __init__(self, options: list[str], sheet: LoopingSpriteSheet, bugs=5, bug_spacing=100, option_spacing=75):
+        self.title = text('BUG', 150, self.COLOR)
+        self.subtitle = text('INVADERS', 55, self.COLOR)
+        self.options = [text(i, 55, self.COLOR) for i in options]
+        self.selected_options = [text(f'- {i} -', 55, self.COLOR) for i in options]
+        self.option_spacing = option_spacing
+        self.sheet = sheet
+        w, h = sheet.images[0].get_size()
+        self.bug_rows = []
+        for image in sheet.images:
+            row = pygame.Surface((bug_spacing * (bugs - 1) + w, h), pygame.SRCALPHA)
+            row.blits([(image, (i * bug_spacing, 0)) for i in range(bugs)], doreturn=False)
+            self.bug_rows.append(row)
+        self.bug_row_rect = self.bug_rows[0].get_rect(center=(WIDTH // 2, HEIGHT // 2 - 50 - 25))
+
+    def draw(self, surf: pygame.Surface, y, selected, bob):
+        # y: title position, bob: vertical offset of the selected option
+        blits = [
+            (self.title, self.title.get_rect(center=(WIDTH // 2, y))),
+            (self.subtitle, self.subtitle.get_rect(center=(WIDTH // 2 - 8, y + 100))),
+        ]
+        option_y = HEIGHT // 2
+        for i, option in enumerate(self.options):
+            if i == selected:
+                option = self.selected_options[i]
+                blits.append((option, option.get_rect(center=(WIDTH // 2, option_y + bob))))
+            else:
+                blits.append((option, option.get_rect(center=(WIDTH // 2, option_y))))
+            option_y += self.option_spacing
+        blits.append((self.bug_rows[self.sheet.c], self.bug_row_rect))
+        surf.blits(blits, doreturn=False)
+
+
 class Home(Scene):
     def __init__(self, manager, name):
         super().__init__(manager, name)
@@ -128,39 +189,29 @@ class Home(Scene):
             lambda: sys.exit(0)
         ]
         self.selected = 0
-        self.sheet = LoopingSpriteSheet(get_path('assets', 'images', 'minibug_sheet.png'), 1, 3, 3, scale=2)
-
-    def update(self, events: list[pygame.event.Event]):
-        self.y = 150 + math.sin(time.time() * 2) * 20
-        for e in events:
-            if e.type == pygame.KEYDOWN:
-                if e.key == pygame.K_UP:
-                    self.selected -= 1
-                if e.key == pygame.K_DOWN:
-                    self.selected += 1
-                if e.key == pygame.K_RETURN:
-                    if self.actions[self.selected] is not None:
-                        try:
-                            self.actions[self.selected]()
-                        except Exception as e:
-                            print(e)
-                self.selected %= len(self.options)
+        self.sheet = looping_sheet('minibug')
+        self.bob = 0
+        self.renderer = MenuRenderer(self.options, self.sheet)
+
+    def update(self, events: list[pygame.event.Event], dt=1 / FPS):
+        now = get_time()
+        self.y = 150 + math.sin(now * 2) * 20
+        self.bob = math.sin(now * 5) * 3
+        for action in INPUT.action_downs:
+            if action == 'up':
+                self.selected -= 1
+            if action == 'down':
+                self.selected += 1
+            if action == 'confirm':
+                if self.actions[self.selected] is not None:
+                    try:
+                        self.actions[self.selected]()
+                    except Exception as e:
+                        print(e)
+            self.selected %= len(self.options)
 
     def draw(self, surf: pygame.Surface):
-        t = text('BUG', 150, '#511309')
-        surf.blit(t, t.get_rect(center=(WIDTH // 2, self.y)))
-        t = text('INVADERS', 55, '#511309')
-        surf.blit(t, t.get_rect(center=(WIDTH // 2 - 8, self.y + 100)))
-        y = HEIGHT // 2
-        for i in range(len(self.options)):
-            if i == self.selected:
-                t = text(f'- {self.options[i]} -', 55, '#511309')
-            else:
-                t = text(self.options[i], 55, '#511309')
-            surf.blit(t, t.get_rect(center=(WIDTH // 2, y + ((math.sin(time.time() * 5) * 3) if i == self.selected else 0))))
-            y += 75
-        for i in (-2, -1, 0, 1, 2):
-            self.sheet.draw(surf, WIDTH // 2 + i * 100, HEIGHT // 2 - 50 - 25)
+        self.renderer.draw(surf, self.y, self.selected, self.bob)
 
 
 class Game(Scene):
@@ -184,7 +235,7 @@ class Game(Scene):
         #     self.objects_manager.add(BugHole(WIDTH // 2, 100 * i))
         self.spawn_timer = Timer(1)
         self.player = self.objects_manager.player
-        self.heart_img = load_image(get_path('assets', 'images', 'heart.png'), scale=4)
+        self.heart_img = frame('heart/0')
         self.timer = Timer(2)
         self.stage = 'game'
         # TODO disable manual resetting of levels
@@ -194,8 +245,8 @@ class Game(Scene):
     def set_stage(self, stage):
         self.stage = stage
 
-    def update(self, events: list[pygame.event.Event]):
-        self.objects_manager.update(events)
+    def update(self, events: list[pygame.event.Event], dt=1 / FPS):
+        self.objects_manager.update(events, dt)
         self.subtitles_manager.update()
         # self.bug_holes = [i for i in self.bug_holes if i.alive]
         if not any([not i.done() for i in self.bug_holes]):
@@ -252,7 +303,7 @@ class Game(Scene):
                                          callback=f,
                                          diff=45,
                                          particles_per_line=15,
-                                         rate=5,
+                                         rate=300,
                                          max_particle_size=7
                                          )
                 )
@@ -273,15 +324,18 @@ class Game(Scene):
     def draw(self, surf: pygame.Surface):
         self.objects_manager.draw(surf)
         rect = pygame.Rect(0, 0, WIDTH, 50)
-        pygame.draw.rect(surf, '#511309', rect)
-        pygame.draw.rect(surf, '#000000', rect, 5)
+        draw_rect(surf, '#511309', rect)
+        draw_rect(surf, '#000000', rect, 5)
         t = text(self.player.score + 15000, 35, 'white', False)
         surf.blit(t, t.get_rect(centery=rect.centery - 2, right=rect.right - 10))
         for i in range(self.player.lives):
             x = i * (self.heart_img.get_width() + 10) + self.heart_img.get_width()
             surf.blit(self.heart_img, self.heart_img.get_rect(center=(x, rect.centery)))
         t = text('Wave 1', 35, 'white', False)
-        surf.blit(t, t.get_rect(centerx=rect.centerx, centery=rect.centery - 2))
+        wave_rect = surf.blit(t, t.get_rect(centerx=rect.centerx, centery=rect.centery - 2))
+        if QUALITY.tier > 0:
+            t = text(f'{QUALITY.name} quality', 20, 'white', False)
+            surf.blit(t, t.get_rect(left=wave_rect.right + 20, centery=rect.centery - 2))
         self.subtitles_manager.draw(surf)
 
 
@@ -336,28 +390,34 @@ class SceneManager:
                     self.menu.reset()
                 self._subtitle_manager.clear()
 
-    def update(self, events: list[pygame.event.Event]):
+    @property
+    def animating(self):
+        # the error screen is static too
+        menu = self.menu
+        return ((menu.animating and menu.error is None) or self.to_switch != 'none'
+                or self._transition_manager.animating or self._subtitle_manager.animating)
+
+    def update(self, events: list[pygame.event.Event], dt=1 / FPS):
         if self.to_switch != 'none':
             if self._transition_manager.transition.status == 'closed':
                 self.switch_mode(self.to_switch, self.to_reset, transition=False, save_in_stack=self.to_save_in_stack)
                 self.to_switch = 'none'
                 self.to_reset = False
                 self._transition_manager.open()
-        self.menu.update(events)
-        self._transition_manager.update(events)
+        self.menu.update(events, dt)
+        self._transition_manager.update(events, dt)
         # self._objects_manager.update(events)
         self._subtitle_manager.update()
-        for e in events:
-            if e.type == pygame.KEYDOWN:
-                if e.key == pygame.K_r:
-                    self.menu.reset()
-                if e.key == pygame.K_ESCAPE:
-                    self.switch_to_prev_mode()
-                if e.key == pygame.K_s:
-                    if self.mode == 'game':
-                        self.switch_mode('home', transition=True)
-                    else:
-                        self.switch_mode('game', transition=True)
+        for key in INPUT.downs:
+            if key == pygame.K_r:
+                self.menu.reset()
+            if key == pygame.K_ESCAPE:
+                self.switch_to_prev_mode()
+            if key == pygame.K_s:
+                if self.mode == 'game':
+                    self.switch_mode('home', transition=True)
+                else:
+                    self.switch_mode('game', transition=True)
 
     def draw(self, surf: pygame.Surface):
         self.menu.draw(surf)
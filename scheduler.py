@@ -0,0 +1,73 @@
+import asyncio
+import sys
+import time
+
+import pygame
+
+from config import FPS, IDLE_FPS, IDLE_DELAY, PACING
+from pacing import FramePacer
+
+
+class FrameScheduler:
+    """
+    Decides how long the game loop waits before the next frame
+
+    While the scene is animating, or input arrived in the last `idle_delay` seconds,
+    frames are paced at `fps` by a FramePacer. Otherwise the loop blocks in pygame.event.wait for up to
+    1 / idle_fps seconds (forever with idle_fps = 0) and wakes up as soon as input arrives,
+    the event that woke it up is handed to the next frame first by get_events.
+    In the browser, where blocking is not possible, it sleeps through asyncio instead
+    """
+
+    def __init__(self, fps=FPS, idle_fps=IDLE_FPS, idle_delay=IDLE_DELAY, pacing=PACING):
+        self.fps = fps
+        self.idle_fps = idle_fps
+        self.idle_delay = idle_delay
+        self.pacer = FramePacer(fps, pacing)
+        self.clock = self.pacer.clock
+        self._last_activity = time.perf_counter()
+        self.idle = False
+        self._woken_by: list[pygame.event.Event] = []  # taken off the queue by pygame.event.wait
+        # counters, frames_rendered / elapsed time is the redraw rate to compare power draw with
+        self.frames_rendered = 0
+        self.idle_frames = 0
+        self.start_time = time.perf_counter()
+
+    def get_events(self) -> list[pygame.event.Event]:
+        """pygame.event.get, with the event that ended the last idle wait in front"""
+        events = pygame.event.get()
+        if self._woken_by:
+            events[:0] = self._woken_by
+            self._woken_by = []
+        return events
+
+    def note_events(self, events: list[pygame.event.Event]):
+        if events:
+            self._last_activity = time.perf_counter()
+
+    def note_frame(self, presented=True):
+        if presented:
+            self.frames_rendered += 1
+            if self.idle:
+                self.idle_frames += 1
+
+    @property
+    def redraw_rate(self):
+        elapsed = time.perf_counter() - self.start_time
+        return self.frames_rendered / elapsed if elapsed > 0 else 0.0
+
+    async def wait(self, animating) -> float:
+        """Waits for the next frame and returns the seconds since the previous one"""
+        if animating:
+            self._last_activity = time.perf_counter()
+        self.idle = not animating and time.perf_counter() - self._last_activity >= self.idle_delay
+        if not self.idle:
+            return self.pacer.wait()
+        timeout = 1 / self.idle_fps if self.idle_fps else 0
+        if sys.platform == 'emscripten':
+            await asyncio.sleep(timeout or 1 / self.fps)
+        else:
+            event = pygame.event.wait(int(timeout * 1000))
+            if event.type != pygame.NOEVENT:
+                self._woken_by.append(event)
+        return self.pacer.wait(0, record=False)
@@ -0,0 +1,268 @@
+"""
+Headless batch runner for balance and soak testing
+
+Plays many games in parallel without a window, each with its own seed, input policy
+and simulated clock, and writes one row of metrics per game to a csv file
+
+usage: python simulate.py --games 1000 --policy random --out results.csv
+"""
+
+import argparse
+import csv
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+FIELDS = [
+    'game', 'seed', 'policy', 'outcome', 'frames', 'seconds', 'bugs_killed', 'bugs_escaped', 'lives_lost',
+    'frame_ms_p50', 'frame_ms_p95', 'frame_ms_p99', 'frame_ms_max', 'error',
+]
+
+
+class SimulatedClock:
+    """Clock that only moves when advanced, used as the time source of every Timer"""
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, dt):
+        self.now += dt
+
+
+class PressedKeys(set):
+    """Stand-in for pygame.key.get_pressed() built from a set of held keys"""
+
+    def __getitem__(self, key):
+        return key in self
+
+
+class InputPolicy:
+    def __init__(self, seed=None):
+        self.random = random.Random(seed)
+        self.held = PressedKeys()
+
+    def next_action(self, frame):
+        # returns the arrow key to hold for this frame or None to release all keys
+        raise NotImplementedError
+
+    def step(self, frame):
+        import pygame
+
+        action = self.next_action(frame)
+        events = []
+        for key in list(self.held):
+            if key != action:
+                self.held.discard(key)
+                events.append(pygame.event.Event(pygame.KEYUP, key=key))
+        if action is not None and action not in self.held:
+            self.held.add(action)
+            events.append(pygame.event.Event(pygame.KEYDOWN, key=action))
+        return events, self.held
+
+
+class IdlePolicy(InputPolicy):
+    def next_action(self, frame):
+        return None
+
+
+class RandomPolicy(InputPolicy):
+    """Holds a random arrow key (or nothing) for a random number of frames"""
+
+    def __init__(self, seed=None, min_hold=5, max_hold=60):
+        super().__init__(seed)
+        self.min_hold = min_hold
+        self.max_hold = max_hold
+        self.action = None
+        self.change_at = 0
+
+    def next_action(self, frame):
+        import pygame
+
+        if frame >= self.change_at:
+            self.action = self.random.choice([None, pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN])
+            self.change_at = frame + self.random.randint(self.min_hold, self.max_hold)
+        return self.action
+
+
+class SweepPolicy(InputPolicy):
+    """Scripted policy that sweeps left and right across the screen"""
+
+    def __init__(self, seed=None, period=120):
+        super().__init__(seed)
+        self.period = period
+
+    def next_action(self, frame):
+        import pygame
+
+        return pygame.K_LEFT if (frame // self.period) % 2 else pygame.K_RIGHT
+
+
+POLICIES = {
+    'idle': IdlePolicy,
+    'random': RandomPolicy,
+    'sweep': SweepPolicy,
+}
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def init_headless():
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+    import pygame
+
+    pygame.display.init()
+    pygame.font.init()
+    pygame.display.set_mode((1, 1))
+
+
+def play(game_id, seed, policy='random', max_frames=60 * 60 * 10, dt=None, render=True, bug_count=None, spawn_interval=None):
+    """Play a single game headless and return its metrics"""
+    init_headless()
+    import pygame
+
+    import utils
+    from animation import ANIMATIONS
+    from audio import AUDIO
+    from config import FPS, WIDTH, HEIGHT
+    from controls import INPUT
+    from events import BugDestroyedEvent
+    from objects import Player
+    from scene import SceneManager
+
+    dt = dt or 1 / FPS
+    random.seed(seed)
+    clock = SimulatedClock()
+    utils.set_time_source(clock)
+    ANIMATIONS.reset()
+    AUDIO.enabled = False
+    surf = pygame.Surface((WIDTH, HEIGHT)) if render else None
+
+    manager = SceneManager()
+    manager.switch_mode('game', reset=True)
+    game = manager.menu
+    if bug_count is not None:
+        for i in game.bug_holes:
+            i.total_bug_count = bug_count
+    if spawn_interval is not None:
+        game.spawn_timer.timeout = spawn_interval
+    input_policy = POLICIES[policy](seed)
+
+    kills = {'bullet': 0, 'escaped': 0}
+
+    def on_bug_destroyed(event):
+        # 'player' (contact) and 'cleared' (column cleared on pause) are neither
+        if event.cause in kills:
+            kills[event.cause] += 1
+
+    game.objects_manager.events.subscribe(BugDestroyedEvent, on_bug_destroyed)
+
+    frame_times = []
+    frame = 0
+    outcome = 'timeout'
+    while frame < max_frames:
+        events, keys = input_policy.step(frame)
+        start = time.perf_counter()
+        INPUT.process(events, keys)
+        manager.update(events, dt)
+        ANIMATIONS.tick(dt)
+        if surf is not None:
+            manager.draw(surf)
+        frame_times.append((time.perf_counter() - start) * 1000)
+        clock.advance(dt)
+        frame += 1
+        if game.error is not None:
+            outcome = 'error'
+            break
+        if manager.mode != 'game' or manager.to_switch != 'none':
+            outcome = 'game_over' if game.player.lives <= 0 else 'cleared'
+            break
+    utils.set_time_source()
+
+    return {
+        'game': game_id,
+        'seed': seed,
+        'policy': policy,
+        'outcome': outcome,
+        'frames': frame,
+        'seconds': round(frame * dt, 3),
+        'bugs_killed': kills['bullet'],
+        'bugs_escaped': kills['escaped'],
+        'lives_lost': Player.TOTAL_LIVES - game.player.lives,
+        'frame_ms_p50': round(percentile(frame_times, 50), 4),
+        'frame_ms_p95': round(percentile(frame_times, 95), 4),
+        'frame_ms_p99': round(percentile(frame_times, 99), 4),
+        'frame_ms_max': round(max(frame_times, default=0), 4),
+        'error': repr(game.error) if game.error is not None else '',
+    }
+
+
+def run_batch(games, out, workers=None, seed=0, **kwargs):
+    """Run games in a process pool, streaming each result into the csv as soon as it arrives"""
+    start = time.perf_counter()
+    results = []
+    with open(out, 'w', newline='') as f, ProcessPoolExecutor(max_workers=workers) as executor:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        futures = [executor.submit(play, i, seed + i, **kwargs) for i in range(games)]
+        for future in as_completed(futures):
+            row = future.result()
+            writer.writerow(row)
+            f.flush()
+            results.append(row)
+    elapsed = time.perf_counter() - start
+    return results, elapsed
+
+
+def summarize(results, elapsed):
+    outcomes = {}
+    for i in results:
+        outcomes[i['outcome']] = outcomes.get(i['outcome'], 0) + 1
+    n = max(len(results), 1)
+    frames = sum(i['frames'] for i in results)
+    print(f'{len(results)} games in {elapsed:.1f}s ({frames / max(elapsed, 1e-9):.0f} simulated frames/s)')
+    print('outcomes:', ', '.join(f'{k}={v}' for k, v in sorted(outcomes.items())))
+    print(f'mean frames survived: {frames / n:.1f}')
+    print(f'mean bugs killed: {sum(i["bugs_killed"] for i in results) / n:.2f}')
+    print(f'mean lives lost: {sum(i["lives_lost"] for i in results) / n:.2f}')
+    print(f'frame ms p95 (worst game): {max((i["frame_ms_p95"] for i in results), default=0):.3f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=None, help='defaults to the number of cores')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first game, game i uses seed + i')
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='random')
+    parser.add_argument('--max-frames', type=int, default=60 * 60 * 10)
+    parser.add_argument('--dt', type=float, default=None, help='simulated seconds per frame, defaults to 1 / FPS')
+    parser.add_argument('--no-render', action='store_true', help='skip drawing, only simulate')
+    parser.add_argument('--bug-count', type=int, default=None, help='bugs spawned per bug hole')
+    parser.add_argument('--spawn-interval', type=float, default=None, help='seconds between spawns')
+    parser.add_argument('--out', default='simulation.csv')
+    args = parser.parse_args()
+
+    results, elapsed = run_batch(
+        args.games, args.out, args.workers, args.seed,
+        policy=args.policy,
+        max_frames=args.max_frames,
+        dt=args.dt,
+        render=not args.no_render,
+        bug_count=args.bug_count,
+        spawn_interval=args.spawn_interval,
+    )
+    summarize(results, elapsed)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,17 +1,44 @@
+from functools import lru_cache
+
 import pygame
 from utils import Timer, text
 from config import WIDTH, HEIGHT
+from quality import QUALITY
 from typing import Union
 
+PANEL_COLOR = '#511309'
+PANEL_BORDER_COLOR = 'black'
+PANEL_PADDING = 20
+
+
+def render_panel(name, size=35, color='white', visible=True):
+    """Prerender the subtitle box (background, border and optionally the text) into one surface"""
+    t = text(name, size, color)
+    rect = t.get_rect().inflate(PANEL_PADDING, PANEL_PADDING)
+    panel = pygame.Surface(rect.size)
+    panel.fill(PANEL_COLOR)
+    pygame.draw.rect(panel, PANEL_BORDER_COLOR, panel.get_rect(), 2)
+    if visible:
+        panel.blit(t, t.get_rect(center=panel.get_rect().center))
+    return panel
+
+
+@lru_cache(maxsize=100)
+def shared_panel(name, size=35, color='white', visible=True):
+    """Same as render_panel, but subtitles with identical text and style get the same surface"""
+    return render_panel(name, size, color, visible)
+
 
 class Subtitle:
-    def __init__(self, name, time=None, size=35, pos=(WIDTH // 2, HEIGHT // 2), color='white', callback=None):
+    def __init__(self, name, time=None, size=35, pos=(WIDTH // 2, HEIGHT // 2), color='white', callback=None, shared=False):
         self.timer = Timer(time if time and type(time) != str else max(len(name) * 0.25, 0))
         self._time = time
         self.done = False
         self.pos = pos
         self.callback = callback
-        self.text = text(name, size, color)
+        self._get_panel = shared_panel if shared else render_panel
+        self.panel = self._get_panel(name, size, color)
+        self.rect = self.panel.get_rect(center=self.pos)
 
     def update(self):
         if self.timer.tick:
@@ -21,33 +48,23 @@ class Subtitle:
                     self.callback()
 
     def draw(self, surf: pygame.Surface):
-        rect = self.text.get_rect(center=self.pos)
-        rect1 = rect.inflate(20, 20)
-        pygame.draw.rect(surf, '#511309', rect1)
-        pygame.draw.rect(surf, 'black', rect1, 2)
-        surf.blit(self.text, rect)
+        surf.blit(self.panel, self.rect)
 
 
 class BlinkingSubtitle(Subtitle):
-    def __init__(self, name, time=None, size=35, pos=(WIDTH // 2, HEIGHT // 2), color='white', callback=None, blink_timer=0.5):
-        super().__init__(name, time, size, pos, color, callback)
+    def __init__(self, name, time=None, size=35, pos=(WIDTH // 2, HEIGHT // 2), color='white', callback=None, blink_timer=0.5, shared=False):
+        super().__init__(name, time, size, pos, color, callback, shared)
         self.blink_timer = Timer(blink_timer)
         self.visible = True
+        self.hidden_panel = self._get_panel(name, size, color, False)
 
     def update(self):
         if self.blink_timer.tick:
-            self.visible = not self.visible
+            self.visible = not self.visible if QUALITY.settings['subtitle_effects'] else True
         super().update()
 
     def draw(self, surf: pygame.Surface):
-        if not self.visible:
-            rect = self.text.get_rect(center=self.pos)
-            rect1 = rect.inflate(20, 20)
-            pygame.draw.rect(surf, '#511309', rect1)
-            pygame.draw.rect(surf, 'black', rect1, 2)
-            return
-        else:
-            super().draw(surf)
+        surf.blit(self.panel if self.visible else self.hidden_panel, self.rect)
 
 
 def get_typed_subtitles(_text, _time=2, _time_diff=0.05, pos=None, callback=None):
@@ -55,9 +72,9 @@ def get_typed_subtitles(_text, _time=2, _time_diff=0.05, pos=None, callback=None
         pos = (WIDTH // 2, HEIGHT // 2)
     subtitles = []
     for i in range(1, len(_text) - 2):
-        subtitles.append(Subtitle(_text[0:i], _time_diff, pos=pos))
-    subtitles.append(Subtitle(_text[0:-1], _time_diff, pos=pos, callback=callback))
-    subtitles.append(Subtitle(_text, _time, pos=pos))
+        subtitles.append(Subtitle(_text[0:i], _time_diff, pos=pos, shared=True))
+    subtitles.append(Subtitle(_text[0:-1], _time_diff, pos=pos, callback=callback, shared=True))
+    subtitles.append(Subtitle(_text, _time, pos=pos, shared=True))
     return subtitles
 
 
@@ -74,6 +91,10 @@ class SubtitleManager:
         self.subtitles.clear()
         self.current_subtitle = None
 
+    @property
+    def animating(self):
+        return self.current_subtitle is not None or bool(self.subtitles)
+
     def add(self, subtitle: Subtitle):
         self.subtitles.append(subtitle)
 
@@ -0,0 +1,37 @@
+import os
+import sys
+from pathlib import Path
+
+# no window or sound card needed, must be set before pygame starts its subsystems
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pygame
+import pytest
+
+import atlas
+from config import WIDTH, HEIGHT
+
+
+@pytest.fixture(scope='session', autouse=True)
+def display():
+    pygame.display.init()
+    yield pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.quit()
+
+
+@pytest.fixture(scope='session')
+def placeholder_atlas(display):
+    # plain frames for every sprite, so objects can be created without the image files
+    pages, index = [], {}
+    for sprite, (path, rows, cols, images, scale, color_key) in atlas.SPRITES.items():
+        for i in range(images):
+            page = pygame.Surface((16 * scale, 16 * scale), pygame.SRCALPHA)
+            page.fill('white')
+            index[f'{sprite}/{i}'] = (len(pages), 0, 0, *page.get_size())
+            pages.append(page)
+    atlas._atlas = atlas.TextureAtlas(pages, index)
+    yield atlas._atlas
+    atlas._atlas = None
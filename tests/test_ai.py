@@ -0,0 +1,99 @@
+import random
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import ai
+from ai import AIScheduler
+
+
+class Agent:
+    def __init__(self, x=0, y=0, angle=0, target=None, think_time=0):
+        self.x, self.y, self.angle = x, y, angle
+        self.target = target
+        self.alive = True
+        self.think_time = think_time
+        self.decisions = 0
+
+    def use_ai(self):
+        if self.think_time:
+            time.sleep(self.think_time)
+        self.decisions += 1
+
+
+@pytest.mark.parametrize('distance, interval', [(0, 0.1), (150, 0.1), (151, 0.3), (400, 0.3), (5000, 0.75)])
+def test_far_agents_decide_less_often(distance, interval):
+    assert AIScheduler().interval(distance) == interval
+
+
+def test_decisions_follow_the_distance_to_the_focus():
+    scheduler = AIScheduler(budget_ms=100)
+    near, far = Agent(0, 100), Agent(0, 1000)
+    scheduler.add(near)
+    scheduler.add(far)
+    focus = SimpleNamespace(x=0, y=0)
+    for _ in range(10):
+        scheduler.update(0.1, focus)
+    assert near.decisions > far.decisions > 0
+
+
+def test_the_budget_defers_agents_round_robin():
+    scheduler = AIScheduler(budget_ms=1)
+    agents = [Agent(think_time=0.002) for _ in range(5)]
+    for agent in agents:
+        scheduler.add(agent)
+    scheduler.update(0)
+    assert (scheduler.decisions, scheduler.deferred) == (1, 4)
+    for _ in range(4):
+        scheduler.update(0)
+    assert [i.decisions for i in agents] == [1] * 5
+    assert scheduler.deferred == 0
+
+
+def test_dead_agents_are_dropped():
+    scheduler = AIScheduler()
+    agents = [Agent(), Agent()]
+    for agent in agents:
+        scheduler.add(agent)
+    agents[0].alive = False
+    scheduler.update(0.1)
+    assert scheduler.agents == [agents[1]]
+    assert agents[0].decisions == 0
+
+
+def test_turning_is_limited_by_the_turn_rate():
+    scheduler = AIScheduler(turn_rate=90)
+    agent = Agent(0, 0, angle=0, target=(0, 100))  # straight down is 270
+    scheduler.add(agent)
+    scheduler.update(0.5)
+    assert agent.angle == 315
+    scheduler.update(0.5)
+    assert agent.angle == 270
+    scheduler.update(0.5)
+    assert agent.angle == 270
+
+
+def test_agents_facing_their_target_keep_their_angle():
+    agent = Agent(0, 0, angle=270.3, target=(0, 100))
+    scheduler = AIScheduler()
+    scheduler.add(agent)
+    scheduler.steer(0.1)
+    assert agent.angle == 270.3
+
+
+def test_batched_steering_matches_the_loop(monkeypatch):
+    pytest.importorskip('numpy')
+
+    def agents():
+        rng = random.Random(1)
+        return [Agent(rng.uniform(0, 800), rng.uniform(0, 600), rng.uniform(0, 360),
+                      (rng.uniform(0, 800), rng.uniform(0, 600))) for _ in range(ai.NUMPY_MIN_AGENTS * 2)]
+
+    batched, looped = AIScheduler(), AIScheduler()
+    batched.agents = agents()
+    looped.agents = agents()
+    batched.steer(0.05)
+    monkeypatch.setattr(ai, 'get_numpy', lambda: None)
+    looped.steer(0.05)
+    assert [i.angle for i in batched.agents] == pytest.approx([i.angle for i in looped.agents])
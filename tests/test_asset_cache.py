@@ -0,0 +1,96 @@
+import os
+
+import pygame
+import pytest
+
+from asset_cache import AssetCache, make_key
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'bug.png'
+    image = pygame.Surface((4, 3), pygame.SRCALPHA)
+    image.fill((10, 20, 30, 255))
+    pygame.image.save(image, str(path))
+    return str(path)
+
+
+@pytest.fixture
+def open_cache(tmp_path):
+    caches = []
+
+    def open_cache():
+        caches.append(AssetCache(str(tmp_path / 'assets.cache')))
+        return caches[-1]
+
+    yield open_cache
+    for cache in caches:
+        cache._new.clear()  # nothing left for the atexit hook to write
+        cache._close()
+
+
+def image(color=(10, 20, 30, 255)):
+    surface = pygame.Surface((4, 3), pygame.SRCALPHA)
+    surface.fill(color)
+    return surface
+
+
+def touch(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_keys_are_the_source_followed_by_the_parameters():
+    assert make_key('bug.png', 2, None) == ('bug.png', '2', 'None')
+
+
+def test_saved_entries_are_hits_after_reopening(open_cache, source):
+    cache = open_cache()
+    key = make_key(source, 2)
+    assert cache.get(key, source) is None
+    cache.put(key, source, image())
+    assert cache.get(key, source) is not None
+    cache.save()
+    cache = open_cache()
+    surface = cache.get(key, source)
+    assert (cache.hits, cache.misses) == (1, 0)
+    assert pygame.image.tobytes(surface, 'RGBA') == pygame.image.tobytes(image(), 'RGBA')
+
+
+def test_changed_sources_are_misses(open_cache, source):
+    cache = open_cache()
+    key = make_key(source)
+    cache.put(key, source, image())
+    cache.save()
+    touch(source)
+    cache = open_cache()
+    assert cache.get(key, source) is None
+    assert cache.misses == 1
+
+
+def test_save_drops_entries_of_changed_sources(open_cache, source, tmp_path):
+    other = str(tmp_path / 'other.png')
+    pygame.image.save(image(), other)
+    cache = open_cache()
+    cache.put(make_key(source), source, image())
+    cache.save()
+    touch(source)
+    cache.put(make_key(other), other, image())
+    cache.save()
+    assert list(open_cache()._index) == [make_key(other)]
+
+
+def test_missing_sources_are_not_served(open_cache, source):
+    cache = open_cache()
+    key = make_key(source)
+    cache.put(key, source, image())
+    os.remove(source)
+    assert cache.get(key, source) is None
+
+
+def test_a_corrupt_file_gives_an_empty_cache(open_cache, tmp_path):
+    (tmp_path / 'assets.cache').write_bytes(b'not a cache at all')
+    cache = open_cache()
+    assert cache._index == {}
+    cache.clear()
+    assert not (tmp_path / 'assets.cache').exists()
@@ -0,0 +1,43 @@
+import pygame
+import pytest
+
+from atlas import TextureAtlas, pack
+
+
+def overlaps(a, b):
+    return a[0] == b[0] and pygame.Rect(a[1:]).colliderect(pygame.Rect(b[1:]))
+
+
+def test_frames_are_packed_without_overlapping():
+    sizes = {f'sprite/{i}': (10 + i * 7 % 23, 5 + i * 11 % 17) for i in range(40)}
+    index = pack(sizes, page_size=64, padding=1)
+    assert index.keys() == sizes.keys()
+    rects = list(index.values())
+    for i, a in enumerate(rects):
+        page, x, y, w, h = a
+        assert (w, h) == sizes[list(index)[i]]
+        assert x + w + 1 <= 64 and y + h + 1 <= 64
+        assert not any(overlaps(a, b) for b in rects[i + 1:])
+    assert max(i[0] for i in rects) > 0  # more than one page was needed
+
+
+def test_tallest_frames_go_on_the_first_shelf():
+    index = pack({'small': (4, 4), 'tall': (4, 20), 'medium': (4, 10)}, page_size=64, padding=1)
+    assert index == {'tall': (0, 0, 0, 4, 20), 'medium': (0, 5, 0, 4, 10), 'small': (0, 10, 0, 4, 4)}
+
+
+def test_frames_too_big_for_a_page_are_rejected():
+    with pytest.raises(ValueError):
+        pack({'huge': (64, 10)}, page_size=64, padding=1)
+
+
+def test_frames_are_views_into_the_pages():
+    page = pygame.Surface((20, 10), pygame.SRCALPHA)
+    page.fill('red', (0, 0, 10, 10))
+    page.fill('blue', (10, 0, 10, 10))
+    atlas = TextureAtlas([page], {'bug/0': (0, 0, 0, 10, 10), 'bug/1': (0, 10, 0, 10, 10)})
+    assert atlas.frame('bug/1').get_parent() is page
+    assert [i.get_at((0, 0)) for i in atlas.frames('bug')] == [pygame.Color('red'), pygame.Color('blue')]
+    assert 'bug/1' in atlas and 'bug/2' not in atlas
+    with pytest.raises(KeyError):
+        atlas.frames('boss')
@@ -0,0 +1,70 @@
+import wave
+
+import pygame
+import pytest
+
+from audio import AudioManager
+
+
+@pytest.fixture
+def sounds(tmp_path):
+    # two seconds of silence, long enough to keep a channel busy for the whole test
+    path = str(tmp_path / 'silence.wav')
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(22050)
+        f.writeframes(bytes(2 * 22050 * 2))
+    return {'low': (path, 0, 1.0), 'mid': (path, 1, 1.0), 'high': (path, 2, 1.0)}
+
+
+@pytest.fixture
+def audio(sounds):
+    manager = AudioManager(sounds, channels=2, max_per_frame=5)
+    if not manager.init():
+        pytest.skip('no audio driver')
+    yield manager
+    manager.stop_all()
+    pygame.mixer.quit()
+
+
+def test_disabled_manager_does_not_start_the_mixer(sounds):
+    manager = AudioManager(sounds, enabled=False)
+    assert manager.play('low') is None
+    assert not manager.initialized
+
+
+def test_sounds_are_limited_per_frame(audio):
+    audio.max_per_frame = 1
+    assert audio.play('low') is not None
+    assert audio.play('low') is None
+    assert audio.limited == 1
+    audio.end_frame()
+    assert audio.play('low') is not None
+
+
+def test_free_channels_are_used_first(audio):
+    assert audio.play('low') is audio.channels[0]
+    assert audio.play('low') is audio.channels[1]
+    assert audio.stolen == 0
+
+
+def test_busy_pool_steals_the_oldest_lower_priority_sound(audio):
+    audio.play('low')
+    audio.play('mid')
+    assert audio.play('high') is audio.channels[0]
+    assert audio.play('high') is audio.channels[1]
+    assert audio.stolen == 2
+
+
+def test_sounds_are_dropped_when_every_channel_has_a_higher_priority(audio):
+    audio.play('high')
+    audio.play('high')
+    assert audio.play('low') is None
+    assert audio.dropped == 1
+    assert audio.played == 2
+
+
+def test_unknown_sounds_are_ignored(audio):
+    assert audio.play('missing') is None
+    assert audio.played == 0
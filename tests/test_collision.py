@@ -0,0 +1,80 @@
+from types import SimpleNamespace
+
+import pygame
+import pytest
+
+from audio import AUDIO
+from collision import bounds, get_mask, overlap, quantize_angle
+from events import BugDestroyedEvent
+from objects import Bug, ObjectManager, PlayerBullet
+
+
+def disc(radius=10):
+    image = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+    pygame.draw.circle(image, 'white', (radius, radius), radius)
+    return image
+
+
+def sprite(image, x, y, angle=0):
+    rect = image.get_rect(center=(x, y))
+    return SimpleNamespace(x=x, y=y, rect=rect, mask_image=image, mask_angle=angle)
+
+
+@pytest.mark.parametrize('angle, quantized', [(0, 0), (7, 0), (8, 15), (352, 345), (353, 0), (-8, 345), (725, 0)])
+def test_angles_are_rounded_to_the_mask_step(angle, quantized):
+    assert quantize_angle(angle) == quantized
+
+
+def test_masks_are_shared_per_frame_and_quantized_angle():
+    image = disc()
+    assert get_mask(image, 3) is get_mask(image, 0)
+    assert get_mask(image, 44) is get_mask(image, 45)
+    assert get_mask(image, 0) is not get_mask(image, 45)
+    assert get_mask(disc(), 0) is not get_mask(image, 0)
+
+
+def test_masks_follow_the_rotation():
+    image = pygame.Surface((10, 20), pygame.SRCALPHA)
+    image.fill('white')
+    assert get_mask(image, 0).get_size() == (10, 20)
+    assert get_mask(image, 90).get_size() == (20, 10)
+    assert get_mask(image, 0).count() == 200
+
+
+def test_bounds_are_the_rotated_mask_rect():
+    image = pygame.Surface((10, 20), pygame.SRCALPHA)
+    image.fill('white')
+    assert bounds(sprite(image, 50, 50, 90)) == pygame.Rect(40, 45, 20, 10)
+    plain = SimpleNamespace(rect=pygame.Rect(1, 2, 3, 4), mask_image=None)
+    assert bounds(plain) == plain.rect
+
+
+def test_transparent_corners_do_not_collide():
+    image = disc()
+    a = sprite(image, 0, 0)
+    b = sprite(image, 18, 18)  # rects overlap by 2x2 pixels, the discs don't touch
+    assert a.rect.colliderect(b.rect)
+    assert overlap(a, b) == 0
+    assert overlap(a, sprite(image, 10, 0)) > 0
+
+
+def test_objects_without_masks_collide_by_rect_area():
+    a = SimpleNamespace(rect=pygame.Rect(0, 0, 10, 10), mask_image=None)
+    b = SimpleNamespace(rect=pygame.Rect(5, 6, 10, 10), mask_image=None)
+    c = SimpleNamespace(rect=pygame.Rect(20, 20, 10, 10), mask_image=None)
+    assert overlap(a, b) == 5 * 4
+    assert overlap(a, c) == 0
+
+
+def test_each_bullet_hits_at_most_one_bug(placeholder_atlas, monkeypatch):
+    monkeypatch.setattr(AUDIO, 'enabled', False)
+    manager = ObjectManager()
+    destroyed = []
+    manager.events.subscribe(BugDestroyedEvent, destroyed.append)
+    first, second = Bug(200, 200), Bug(205, 200)
+    bullet, miss = PlayerBullet(202, 200, 'up'), PlayerBullet(600, 100, 'up')
+    manager.add_multiple([first, second, bullet, miss])
+    manager.update([], dt=0)
+    assert not bullet.alive and miss.alive
+    assert [first.alive, second.alive].count(False) == 1
+    assert [i.cause for i in destroyed] == ['bullet']
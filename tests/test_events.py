@@ -0,0 +1,96 @@
+import pytest
+
+from events import EventsManager, GenericEvent, BugDestroyedEvent
+
+
+def post_numbers(manager, numbers):
+    for i in numbers:
+        manager.post(n=i)
+
+
+def numbers(events):
+    return [i.n for i in events]
+
+
+@pytest.mark.parametrize('capacity', [0, -1])
+def test_capacity_below_one_is_rejected(capacity):
+    with pytest.raises(ValueError):
+        EventsManager(capacity)
+
+
+def test_unknown_overflow_policy_is_rejected():
+    with pytest.raises(ValueError):
+        EventsManager(overflow='block')
+
+
+def test_events_keep_their_order_across_the_wrap():
+    manager = EventsManager(3)
+    post_numbers(manager, [1, 2])
+    assert manager.poll().n == 1
+    post_numbers(manager, [3, 4])  # 4 goes to the start of the buffer
+    assert numbers(manager.get()) == [2, 3, 4]
+    assert [manager.poll().n for _ in range(3)] == [2, 3, 4]
+    assert len(manager) == 0
+    with pytest.raises(IndexError):
+        manager.poll()
+
+
+def test_drop_newest_discards_events_posted_to_a_full_buffer():
+    manager = EventsManager(2, 'drop_newest')
+    post_numbers(manager, [1, 2, 3])
+    assert numbers(manager.get()) == [1, 2]
+    assert (manager.posted, manager.dropped) == (2, 1)
+
+
+def test_drop_oldest_overwrites_the_oldest_event():
+    manager = EventsManager(2, 'drop_oldest')
+    post_numbers(manager, [1, 2, 3, 4])
+    assert numbers(manager.get()) == [3, 4]
+    assert manager.overwritten == 2
+
+
+def test_grow_doubles_the_capacity_and_keeps_the_order():
+    manager = EventsManager(2, 'grow')
+    post_numbers(manager, [1, 2])
+    manager.poll()
+    post_numbers(manager, [3, 4, 5])  # full while wrapped, then grows
+    assert manager.capacity == 4
+    assert manager.grown == 1
+    assert numbers(manager.get()) == [2, 3, 4, 5]
+
+
+def test_get_with_clear_empties_the_buffer():
+    manager = EventsManager(2)
+    post_numbers(manager, [1, 2])
+    assert numbers(manager.get(clear=True)) == [1, 2]
+    assert len(manager) == 0
+    post_numbers(manager, [3])
+    assert numbers(manager.get()) == [3]
+
+
+def test_events_go_to_the_subscribers_of_their_type():
+    manager = EventsManager()
+    destroyed, other = [], []
+    manager.subscribe(BugDestroyedEvent, destroyed.append)
+    manager.set_process_event(other.append)
+    manager.post(BugDestroyedEvent(cause='bullet'))
+    manager.post(GenericEvent(n=1))
+    manager.process_all_events()
+    assert [i.cause for i in destroyed] == ['bullet']
+    assert numbers(other) == [1]
+
+
+def test_events_posted_by_handlers_are_handled_in_the_same_pass():
+    manager = EventsManager(1, 'grow')
+    handled = []
+
+    def handle(event):
+        handled.append(event.n)
+        if event.n < 3:
+            manager.post(n=event.n + 1)
+
+    manager.subscribe(GenericEvent, handle)
+    manager.post(n=1)
+    manager.process_all_events()
+    assert handled == [1, 2, 3]
+    assert len(manager) == 0
@@ -0,0 +1,97 @@
+import pygame
+import pytest
+
+from audio import AUDIO
+from objects import BaseObject, ObjectManager
+
+
+class Recorder(BaseObject):
+    def __init__(self, name, log, z=0):
+        super().__init__(100, 100)
+        self.name = name
+        self.log = log
+        self.z = z
+        self.set_rect_size((10, 10))
+
+    def update(self, events, dt=0):
+        self.log.append(('update', self.name))
+
+    def draw(self, surf):
+        self.log.append(('draw', self.name))
+
+
+@pytest.fixture
+def manager(placeholder_atlas, monkeypatch):
+    monkeypatch.setattr(AUDIO, 'enabled', False)
+    return ObjectManager()
+
+
+def names(objects):
+    return [i.name for i in objects]
+
+
+def add(manager, log, *specs):
+    objects = [Recorder(name, log, z) for name, z in specs]
+    manager.add_multiple(objects)
+    manager.update([])
+    log.clear()
+    return objects
+
+
+def test_removal_keeps_insertion_and_layer_order(manager):
+    log = []
+    objects = add(manager, log, ('a', 0), ('b', 1), ('c', 0), ('d', 1), ('e', 0))
+    objects[0].alive = False
+    objects[3].alive = False
+    manager.update([])
+    assert names(manager.objects) == ['b', 'c', 'e']
+    assert names(manager.layers[0]) == ['c', 'e']
+    assert names(manager.layers[1]) == ['b']
+    assert log == [('update', 'b'), ('update', 'c'), ('update', 'e')]
+
+
+def test_draw_order_within_a_layer_survives_removals(manager):
+    log = []
+    objects = add(manager, log, ('a', 0), ('b', 0), ('c', 0), ('d', 0))
+    objects[1].alive = False
+    manager.update([])
+    log.clear()
+    manager.draw(pygame.Surface((200, 200)))
+    assert log == [('draw', 'a'), ('draw', 'c'), ('draw', 'd')]
+
+
+def test_z_changes_during_an_update_pass_are_applied_after_it(manager):
+    manager.update_order = 'z'
+    log = []
+    objects = add(manager, log, ('a', 0), ('b', 0), ('c', 1))
+
+    def update(events, dt=0):
+        log.append(('update', 'a'))
+        objects[0].z = 2  # would move a behind c while layer 0 is iterated
+
+    objects[0].update = update
+    manager.update([])
+    assert log == [('update', 'a'), ('update', 'b'), ('update', 'c')]
+    assert names(manager.iter_layers()) == ['b', 'c', 'a']
+    assert names(manager.objects) == ['a', 'b', 'c']
+
+
+def test_objects_moved_to_a_layer_go_after_its_objects(manager):
+    log = []
+    objects = add(manager, log, ('a', 0), ('b', 1), ('c', 1))
+    objects[0].z = 1
+    objects[2].z = 0
+    manager.update([])
+    assert names(manager.layers[0]) == ['c']
+    assert names(manager.layers[1]) == ['b', 'a']
+
+
+def test_dead_objects_leave_their_layer(manager):
+    log = []
+    objects = add(manager, log, ('a', 0), ('b', 0))
+    objects[0].alive = False
+    manager.update([])
+    objects[0].z = 5  # no longer managed, must not be moved into a layer
+    manager.update([])
+    assert 5 not in manager.layers
+    assert names(manager.iter_layers()) == ['b']
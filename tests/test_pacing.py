@@ -0,0 +1,53 @@
+import pygame
+import pytest
+
+from pacing import FramePacer, LatencyTracker, histogram
+
+
+def key_down(timestamp):
+    return pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE, timestamp=timestamp)
+
+
+def test_histogram_counts_samples_per_bucket():
+    assert histogram([1, 4, 5, 100], (4, 8)) == [('<= 4', 2), ('<= 8', 1), ('> 8', 1)]
+
+
+def test_unknown_pacing_strategy_is_rejected():
+    with pytest.raises(ValueError):
+        FramePacer(strategy='sleep')
+
+
+@pytest.mark.parametrize('strategy', FramePacer.STRATEGIES)
+def test_pacer_waits_for_the_frame_time(strategy):
+    pacer = FramePacer(fps=100, strategy=strategy)
+    pacer.wait()
+    dt = pacer.wait()
+    assert dt >= 0.009
+    assert len(pacer.intervals) == 2
+    assert len(pacer.jitter) == 2
+
+
+def test_unpaced_waits_are_not_recorded():
+    pacer = FramePacer(fps=100, strategy='hybrid')
+    pacer.wait(0)
+    pacer.wait(record=False)
+    assert not pacer.intervals
+
+
+def test_latency_is_measured_when_the_frame_is_presented():
+    tracker = LatencyTracker()
+    tracker.note_events([key_down(1.0), pygame.event.Event(pygame.MOUSEMOTION, timestamp=1.0)])
+    tracker.frame_recorded(0)
+    tracker.frame_presented(0, now=1.02)
+    assert tracker.latencies == pytest.approx([20])
+
+
+def test_pipelined_frames_count_until_their_own_presentation():
+    tracker = LatencyTracker()
+    tracker.frame_recorded(0)  # nothing pending, nothing in flight
+    tracker.note_events([key_down(1.0)])
+    tracker.frame_recorded(1)
+    tracker.frame_presented(0, now=1.01)  # the previous frame doesn't show the input yet
+    assert not tracker.latencies
+    tracker.frame_presented(1, now=1.03)
+    assert tracker.latencies == pytest.approx([30])
@@ -0,0 +1,74 @@
+import pygame
+import pytest
+
+pytest.importorskip('numpy')
+
+from patterns import SPRITE_ANGLES, BulletField, Pattern, Ring  # noqa: E402
+
+
+def field(capacity=8):
+    image = pygame.Surface((4, 8), pygame.SRCALPHA)
+    image.fill('white')
+    return BulletField(image, radius=2, capacity=capacity, bounds=(0, 0, 100, 100))
+
+
+def test_spawned_bullets_move_along_their_angle():
+    bullets = field()
+    bullets.spawn(50, 50, [0, 90, 180], speed=10)
+    assert bullets.vel[:3].ravel().tolist() == pytest.approx([10, 0, 0, -10, -10, 0])
+    assert bullets.sprite[:3].tolist() == [0, SPRITE_ANGLES // 4, SPRITE_ANGLES // 2]
+    bullets.update(0.5)
+    assert bullets.pos[:3].ravel().tolist() == pytest.approx([55, 50, 50, 45, 45, 50])
+
+
+def test_spawning_past_the_capacity_keeps_the_bullets():
+    bullets = field(capacity=2)
+    bullets.spawn(10, 20, [0, 90], speed=1)
+    bullets.spawn(30, 40, [180, 270, 0], speed=1)
+    assert len(bullets) == 5
+    assert len(bullets.pos) == 8
+    assert bullets.pos[:5].tolist() == [[10, 20], [10, 20], [30, 40], [30, 40], [30, 40]]
+    quarter = SPRITE_ANGLES // 4
+    assert bullets.sprite[:5].tolist() == [0, quarter, quarter * 2, quarter * 3, 0]
+
+
+def test_bullets_leaving_the_bounds_are_removed_in_order():
+    bullets = field()
+    for x in (10, 95, 20, 98, 30):
+        bullets.spawn(x, 50, [0], speed=10)
+    bullets.update(0.6)
+    assert len(bullets) == 3
+    assert bullets.pos[:3, 0].tolist() == pytest.approx([16, 26, 36])
+
+
+def test_hit_test_removes_the_bullets_touching_the_rect():
+    bullets = field()
+    bullets.spawn(50, 50, [0, 0], speed=0)
+    bullets.spawn(61, 50, [0], speed=0)  # 1 pixel from the rect, within the radius
+    bullets.spawn(80, 80, [0], speed=0)
+    assert bullets.hit_test(pygame.Rect(40, 40, 20, 20)) == 3
+    assert bullets.pos[:len(bullets)].tolist() == [[80, 80]]
+    assert bullets.hit_test(pygame.Rect(0, 0, 10, 10)) == 0
+
+
+def test_emitters_fire_on_their_interval():
+    bullets = field()
+    ring = Ring(4, speed=10, interval=0.5, rotation=45, stop=1.2)
+    pattern = Pattern([ring])
+    pattern.update(0.1, 50, 50, (50, 90), bullets)
+    assert len(bullets) == 4
+    pattern.update(1.0, 50, 50, (50, 90), bullets)  # catches up on the shots at 0.5 and 1.0
+    assert len(bullets) == 12
+    quarter = SPRITE_ANGLES // 4
+    assert bullets.sprite[8:12].tolist() == [quarter, quarter * 2, quarter * 3, 0]  # third ring, turned by 90
+    pattern.update(1.0, 50, 50, (50, 90), bullets)
+    assert len(bullets) == 12
+
+
+def test_bullets_are_drawn():
+    bullets = field()
+    bullets.spawn(50, 50, [90], speed=0)
+    surf = pygame.Surface((100, 100))
+    bullets.draw(surf)
+    assert surf.get_at((50, 50)) == pygame.Color('white')
+    assert surf.get_at((10, 10)) == pygame.Color('black')
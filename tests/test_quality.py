@@ -0,0 +1,81 @@
+import pytest
+
+from quality import QualityGovernor
+
+
+def governor(**kwargs):
+    kwargs = dict(budget=1.0, window=4, upgrade_delay=3, cooldown=4, enabled=True) | kwargs
+    return QualityGovernor(**kwargs)
+
+
+def record(governor, frame_time, frames):
+    for _ in range(frames):
+        governor.record(frame_time)
+
+
+def test_the_tier_drops_once_the_window_is_over_budget():
+    quality = governor()
+    record(quality, 1.5, 3)
+    assert quality.tier == 0
+    record(quality, 1.5, 1)
+    assert quality.tier == 1
+
+
+def test_no_change_during_the_cooldown():
+    quality = governor()
+    record(quality, 1.5, 4)
+    record(quality, 1.5, 3)
+    assert quality.tier == 1
+    record(quality, 1.5, 1)
+    assert quality.tier == 2
+    record(quality, 1.5, 20)
+    assert (quality.tier, quality.changes) == (2, 2)
+
+
+def test_the_tier_rises_only_after_calm_frames():
+    quality = governor()
+    quality.set_tier(2)
+    record(quality, 0.1, 4 + 1)  # two calm frames once the cooldown is over
+    assert quality.tier == 2
+    record(quality, 0.1, 1)
+    assert quality.tier == 1
+
+
+def test_a_busy_frame_resets_the_calm_count():
+    quality = governor(window=1, cooldown=1)
+    quality.set_tier(1)
+    record(quality, 0.1, 2)
+    record(quality, 0.8, 1)  # between the upgrade and downgrade thresholds
+    record(quality, 0.1, 2)
+    assert quality.tier == 1
+    record(quality, 0.1, 1)
+    assert quality.tier == 0
+
+
+def test_frame_times_between_the_thresholds_keep_the_tier():
+    quality = governor()
+    quality.set_tier(1)
+    record(quality, 0.8, 100)
+    assert (quality.tier, quality.changes) == (1, 1)
+
+
+def test_a_disabled_governor_ignores_frame_times():
+    quality = governor(enabled=False)
+    record(quality, 10, 100)
+    assert quality.tier == 0
+    assert quality.average == 0
+
+
+@pytest.mark.parametrize('tier, quantized', [(0, 37), (1, 30), (2, 45)])
+def test_angles_are_rounded_to_the_tier_step(tier, quantized):
+    quality = governor()
+    quality.set_tier(tier)
+    assert quality.quantize_angle(37) == quantized
+
+
+def test_fewer_particles_on_lower_tiers():
+    quality = governor()
+    assert quality.particles(20, 10) == (20, 10)
+    quality.set_tier(2)
+    assert quality.particles(20, 10) == (7, 20)
+    assert quality.particles(1, 10)[0] == 2
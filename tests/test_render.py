@@ -0,0 +1,72 @@
+import pygame
+
+from pipeline import RenderThread
+from render import DrawList, draw_circle, draw_image, draw_line, draw_rect
+
+SIZE = (64, 48)
+
+
+def sprite():
+    image = pygame.Surface((8, 4), pygame.SRCALPHA)
+    image.fill('yellow')
+    image.fill('red', (0, 0, 2, 4))
+    return image
+
+
+def scene(surf, image):
+    surf.fill('navy')
+    surf.fill('gray', (4, 4, 10, 10))
+    surf.blit(image, (20, 2))
+    surf.blits([(image, (30, 2)), (image, (40, 2))])
+    draw_image(surf, image, 32, 24, angle=90, size=2)
+    draw_image(surf, image, 2, 30, mode='topleft')
+    draw_rect(surf, 'green', (10, 20, 8, 8), 1)
+    draw_circle(surf, 'white', (50, 36), 6)
+    draw_line(surf, 'orange', (0, 47), (63, 30), 2)
+
+
+def pixels(surf):
+    return pygame.image.tobytes(surf, 'RGB')
+
+
+def test_replaying_a_draw_list_matches_drawing_directly():
+    image = sprite()
+    direct = pygame.Surface(SIZE)
+    scene(direct, image)
+    draw_list = DrawList(SIZE)
+    scene(draw_list, image)
+    replayed = pygame.Surface(SIZE)
+    draw_list.replay(replayed)
+    assert pixels(replayed) == pixels(direct)
+
+
+def test_draw_lists_report_the_changed_area_like_surfaces():
+    image = sprite()
+    draw_list, surf = DrawList(SIZE), pygame.Surface(SIZE)
+    assert draw_list.fill('red', (1, 2, 3, 4)) == surf.fill('red', (1, 2, 3, 4))
+    assert draw_list.blit(image, (5, 6)) == surf.blit(image, (5, 6))
+    assert draw_list.blits([(image, (1, 1))]) == surf.blits([(image, (1, 1))])
+    assert draw_list.get_rect(center=(0, 0)) == surf.get_rect(center=(0, 0))
+
+
+def test_the_render_thread_replays_submitted_frames():
+    target = pygame.Surface(SIZE)
+    thread = RenderThread(target)
+    try:
+        assert not thread.wait()
+        draw_list = DrawList(SIZE)
+        draw_list.fill('red')
+        thread.submit(draw_list)
+        assert thread.wait()
+        assert target.get_at((0, 0)) == pygame.Color('red')
+        assert not thread.wait()  # nothing new since the last wait
+        for color in ('green', 'blue'):
+            draw_list = DrawList(SIZE)
+            draw_list.fill(color)
+            thread.submit(draw_list)  # waits for the frame in flight
+        assert thread.wait()
+        assert target.get_at((0, 0)) == pygame.Color('blue')
+        assert thread.frames == 3
+    finally:
+        thread.stop()
+    assert not thread._thread.is_alive()
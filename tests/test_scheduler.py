@@ -0,0 +1,59 @@
+import asyncio
+
+import pygame
+import pytest
+
+from scheduler import FrameScheduler
+
+
+@pytest.fixture
+def scheduler():
+    pygame.event.clear()
+    yield FrameScheduler(fps=1000, idle_fps=100, idle_delay=0.05, pacing='tick')
+    pygame.event.clear()
+
+
+def wait(scheduler, animating=False):
+    return asyncio.run(scheduler.wait(animating))
+
+
+def test_animating_keeps_full_rate(scheduler):
+    scheduler._last_activity -= scheduler.idle_delay
+    wait(scheduler, animating=True)
+    assert not scheduler.idle
+    scheduler.idle_delay = 0
+    wait(scheduler, animating=True)
+    assert not scheduler.idle
+
+
+def test_input_delays_idling(scheduler):
+    scheduler.note_events([pygame.event.Event(pygame.KEYDOWN, key=pygame.K_a)])
+    wait(scheduler)
+    assert not scheduler.idle
+    scheduler._last_activity -= scheduler.idle_delay
+    wait(scheduler)
+    assert scheduler.idle
+    scheduler.note_events([])  # an empty frame is no activity
+    wait(scheduler)
+    assert scheduler.idle
+
+
+def test_the_event_ending_an_idle_wait_comes_first(scheduler):
+    scheduler._last_activity -= scheduler.idle_delay
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_a))
+    pygame.event.post(pygame.event.Event(pygame.KEYUP, key=pygame.K_a))
+    wait(scheduler)
+    assert scheduler.idle
+    events = [i.type for i in scheduler.get_events() if i.type in (pygame.KEYDOWN, pygame.KEYUP)]
+    assert events == [pygame.KEYDOWN, pygame.KEYUP]
+    assert scheduler.get_events() == []
+
+
+def test_frames_are_counted(scheduler):
+    scheduler.note_frame()
+    scheduler._last_activity -= scheduler.idle_delay
+    wait(scheduler)
+    scheduler.note_frame()
+    scheduler.note_frame(presented=False)
+    assert (scheduler.frames_rendered, scheduler.idle_frames) == (2, 1)
+    assert scheduler.redraw_rate > 0
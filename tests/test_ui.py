@@ -0,0 +1,87 @@
+from types import SimpleNamespace
+
+import pygame
+
+from ui import BaseUI, UIContainer
+
+
+class Box(BaseUI):
+    def __init__(self, x, y, w=20, h=20, color='red', focusable=False):
+        super().__init__(x, y)
+        self.rect = pygame.Rect(x, y, w, h)
+        self.color = color
+        self.focusable = focusable
+        self.hovered = self.focused = False
+        self.clicks = 0
+        self.inputs = []
+
+    def set_hovered(self, hovered):
+        self.hovered = hovered
+
+    def set_focused(self, focused):
+        self.focused = focused
+
+    def click(self):
+        self.clicks += 1
+
+    def handle_input(self, input_state):
+        self.inputs.append(input_state)
+
+    def state(self):
+        return self.color
+
+    def render(self):
+        surf = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        surf.fill(self.color)
+        return surf
+
+
+def snapshot(mouse_pos=(0, 0), mouse_moved=False, clicks=()):
+    return SimpleNamespace(mouse_pos=mouse_pos, mouse_moved=mouse_moved, clicks=list(clicks))
+
+
+def test_hit_test_finds_the_topmost_widget():
+    below, above = Box(0, 0), Box(10, 10)
+    container = UIContainer([below, above])
+    assert container.hit_test((5, 5)) is below
+    assert container.hit_test((15, 15)) is above
+    assert container.hit_test((50, 50)) is None
+
+
+def test_hover_changes_only_when_the_mouse_moves():
+    box = Box(0, 0)
+    container = UIContainer([box])
+    container.update(snapshot((5, 5)))
+    assert not box.hovered
+    container.update(snapshot((5, 5), mouse_moved=True))
+    assert box.hovered and container.hovered is box
+    container.update(snapshot((50, 50), mouse_moved=True))
+    assert not box.hovered and container.hovered is None
+
+
+def test_clicks_move_the_focus():
+    field, button = Box(0, 0, focusable=True), Box(30, 0)
+    container = UIContainer([field, button])
+    container.update(snapshot(clicks=[(5, 5)]))
+    assert field.focused and field.clicks == 1
+    assert len(field.inputs) == 1
+    container.update(snapshot(clicks=[(35, 5)]))
+    assert not field.focused and container.focused is None
+    assert button.clicks == 1 and len(field.inputs) == 1
+
+
+def test_the_layer_is_recomposed_only_after_a_widget_changes():
+    box = Box(10, 10)
+    container = UIContainer([box, Box(40, 10, color='blue')])
+    surf = pygame.Surface((100, 100))
+    container.draw(surf)
+    container.draw(surf)
+    layer = container.layer
+    assert container.compositions == 1
+    assert surf.get_at((15, 15)) == pygame.Color('red')
+    box.color = 'green'
+    container.draw(surf)
+    assert container.compositions == 2
+    assert container.layer is not layer  # the old layer may still be queued for drawing
+    assert layer.get_at((5, 5)) == pygame.Color('red')
+    assert surf.get_at((15, 15)) == pygame.Color('green')
@@ -1,6 +1,8 @@
 import pygame
 
-from config import WIDTH, HEIGHT
+from config import WIDTH, HEIGHT, FPS
+from quality import QUALITY
+from render import draw_rect, draw_circle
 from utils import clamp
 
 
@@ -9,7 +11,7 @@ class Transition:
         self.surf = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
         self._status = 'ready'
         self.k = 0
-        self.multiplier = 1
+        self.multiplier = 60  # growth per second
         self.size = 0
 
     def get_size(self) -> int:
@@ -42,7 +44,7 @@ class Transition:
     def stop(self):
         self.k = 0
 
-    def update(self):
+    def update(self, dt=1 / FPS):
         pass
 
     def draw(self, surf: pygame.Surface):
@@ -50,10 +52,10 @@ class Transition:
 
 
 class SquareTransition(Transition):
-    def __init__(self):
+    def __init__(self, size=50):
         super().__init__()
-        self.size = 50
-        self.multiplier = 5
+        self.size = size
+        self.multiplier = 300
         self.squares = [
             [0 for _ in range(WIDTH // self.size + 1)] for _ in range(HEIGHT // self.size + 1)
         ]
@@ -61,10 +63,10 @@ class SquareTransition(Transition):
     def get_size(self) -> int:
         return self.squares[0][0]
 
-    def update(self):
+    def update(self, dt=1 / FPS):
         for row in range(len(self.squares)):
             for col in range(len(self.squares[row])):
-                self.squares[row][col] += self.k
+                self.squares[row][col] += self.k * dt
                 # print(self.k)
                 if self.squares[row][col] > self.size:
                     self.squares[row][col] = self.size
@@ -76,15 +78,15 @@ class SquareTransition(Transition):
             for col in range(len(self.squares[row])):
                 size = self.squares[row][col]
                 # print(size, self.squares)
-                pygame.draw.rect(surf, 'black', (col * self.size + self.size // 2 - size // 2, row * self.size + self.size // 2 - size // 2, size, size))
-                pygame.draw.rect(surf, 'white', (col * self.size + self.size // 2 - size // 2, row * self.size + self.size // 2 - size // 2, size, size), 2)
+                draw_rect(surf, 'black', (col * self.size + self.size // 2 - size // 2, row * self.size + self.size // 2 - size // 2, size, size))
+                draw_rect(surf, 'white', (col * self.size + self.size // 2 - size // 2, row * self.size + self.size // 2 - size // 2, size, size), 2)
 
 
 class CircleTransition(Transition):
-    def __init__(self):
+    def __init__(self, size=50):
         super().__init__()
-        self.size = 50
-        self.multiplier = 2.5
+        self.size = size
+        self.multiplier = 150
         self.circles = [
             [0 for _ in range(WIDTH // self.size + 1)] for _ in range(HEIGHT // self.size + 1)
         ]
@@ -92,10 +94,10 @@ class CircleTransition(Transition):
     def get_size(self) -> int:
         return self.circles[0][0]
 
-    def update(self):
+    def update(self, dt=1 / FPS):
         for row in range(len(self.circles)):
             for col in range(len(self.circles[row])):
-                self.circles[row][col] += self.k
+                self.circles[row][col] += self.k * dt
                 if self.circles[row][col] > self.size:
                     self.circles[row][col] = self.size
                 if self.circles[row][col] < 0:
@@ -105,8 +107,8 @@ class CircleTransition(Transition):
         for row in range(len(self.circles)):
             for col in range(len(self.circles[row])):
                 size = self.circles[row][col]
-                pygame.draw.circle(surf, 'black', (col * self.size, row * self.size), size * 0.55)
-                pygame.draw.circle(surf, 'white', (col * self.size, row * self.size), size * 0.55, 2)
+                draw_circle(surf, 'black', (col * self.size, row * self.size), size * 0.55)
+                draw_circle(surf, 'white', (col * self.size, row * self.size), size * 0.55, 2)
 
 
 class FadeTransition(Transition):
@@ -114,18 +116,24 @@ class FadeTransition(Transition):
         super().__init__()
         self.size = 255
         self.alpha = 0
-        self.multiplier = 4
-        self.surf = pygame.Surface((WIDTH, HEIGHT))
+        self.multiplier = 960
+        self.surf = pygame.Surface((WIDTH, HEIGHT))  # new surfaces are black
+        self.surf.set_alpha(0)
+        # draw alternates between the two, a draw list still in flight may reference the one drawn last frame
+        self._back = pygame.Surface((WIDTH, HEIGHT))
 
     def get_size(self) -> int:
         return self.alpha
 
-    def update(self):
-        self.alpha += self.multiplier * self.k
+    def update(self, dt=1 / FPS):
+        self.alpha += self.k * dt
         self.alpha = clamp(self.alpha, 0, 255)
-        self.surf.set_alpha(self.alpha)
 
     def draw(self, surf: pygame.Surface):
+        alpha = int(self.alpha)
+        if alpha != self.surf.get_alpha():
+            self._back.set_alpha(alpha)
+            self.surf, self._back = self._back, self.surf
         surf.blit(self.surf, (0, 0))
 
 
@@ -139,6 +147,11 @@ class TransitionManager:
         }
 
     def close(self):
+        # grids are rebuilt with the cell size of the current quality tier while fully open
+        cell = QUALITY.settings['transition_cell']
+        if isinstance(self.transition, (SquareTransition, CircleTransition)) and self.transition.size != cell:
+            if self.transition.get_size() <= 0:
+                self.transition = type(self.transition)(cell)
         self.transition.k = self.transition.multiplier
 
     def open(self):
@@ -150,12 +163,12 @@ class TransitionManager:
                 self.transition = self.transitions[transition]()
             # print(self.transition)
 
-    def update(self, events: list[pygame.event.Event]):
-        self.transition.update()
-        for e in events:
-            if e.type == pygame.KEYDOWN:
-                if e.key == pygame.K_p:
-                    pass
+    @property
+    def animating(self):
+        return self.transition.status in ('closing', 'opening')
+
+    def update(self, events: list[pygame.event.Event], dt=1 / FPS):
+        self.transition.update(dt)
 
     def draw(self, surf: pygame.Surface):
         self.transition.draw(surf)
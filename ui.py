@@ -1,14 +1,28 @@
-import time
+from typing import Union
 
+from controls import INPUT
+from render import draw_rect, draw_line
 from utils import *
 import pygame
 
 
 class BaseUI:
+    """
+    Widgets have a rect and render themselves into a cached surface that is only redrawn when state() changes
+
+    Input reaches a widget either through update (standalone) or through a UIContainer,
+    which calls set_hovered / click / set_focused / handle_input
+    """
+
+    focusable = False  # receives keyboard input after being clicked
+
     def __init__(self, x, y):
         self.x = x
         self.y = y
         self.pos = (x, y)
+        self._surface = None
+        self._state = None
+        self.version = 0  # bumped whenever the cached surface is redrawn
 
     @property
     def pos(self):
@@ -18,12 +32,53 @@ class BaseUI:
     def pos(self, pos):
         self.x, self.y = pos
 
-    def update(self, events):
+    def state(self):
+        # everything render depends on
+        return None
+
+    def render(self) -> pygame.Surface:
+        return pygame.Surface((0, 0))
+
+    @property
+    def surface(self) -> pygame.Surface:
+        state = self.state()
+        if self._surface is None or state != self._state:
+            self._state = state
+            self._surface = self.render()  # a new surface, one queued for drawing is never changed
+            self.version += 1
+        return self._surface
+
+    def set_hovered(self, hovered):
         pass
 
-    def draw(self, surf):
+    def click(self):
+        pass
+
+    def set_focused(self, focused):
+        pass
+
+    def handle_input(self, input_state):
+        pass
+
+    def tick(self):
+        # per frame work of widgets that animate by themselves
         pass
 
+    def update(self, events):
+        hovered = self.rect.collidepoint(pygame.mouse.get_pos())
+        self.set_hovered(hovered)
+        for e in events:
+            if e.type == pygame.MOUSEBUTTONDOWN and e.button == 1:
+                if self.focusable:
+                    self.set_focused(hovered)
+                if hovered:
+                    self.click()
+        self.handle_input(INPUT)
+        self.tick()
+
+    def draw(self, surf):
+        surf.blit(self.surface, self.rect)
+
 
 class Button(BaseUI):
     def __init__(self, x=0, y=0, w=100, h=50, label='Button', action=None):
@@ -55,24 +110,23 @@ class Button(BaseUI):
     def deselect(self):
         self.selected = False
 
-    def update(self, events):
-        mx, my = pygame.mouse.get_pos()
-        if self.rect.collidepoint(mx, my):
-            self.is_active = True
-        else:
-            self.is_active = False
-        for e in events:
-            if e.type == pygame.MOUSEBUTTONDOWN:
-                if e.button == 1:
-                    if self.is_active:
-                        self.select()
+    def set_hovered(self, hovered):
+        self.is_active = hovered
 
-    def draw(self, surf):
+    def click(self):
+        self.select()
+
+    def state(self):
+        return self.is_active, self.selected
+
+    def render(self):
+        surf = pygame.Surface((self.w, self.h), pygame.SRCALPHA)
         color = self.active_color if self.selected else self.inactive_color
         if self.selected or self.is_active:
-            pygame.draw.rect(surf, color, (self.x, self.y, self.w, self.h), 2)
-        pygame.draw.line(surf, self.active_color, (self.x, self.y + self.h - 2), (self.x + self.w, self.y + self.h - 2), 2)
-        surf.blit(self.text, self.text.get_rect(center=self.rect.center))
+            draw_rect(surf, color, (0, 0, self.w, self.h), 2)
+        draw_line(surf, self.active_color, (0, self.h - 2), (self.w, self.h - 2), 2)
+        surf.blit(self.text, self.text.get_rect(center=(self.w // 2, self.h // 2)))
+        return surf
 
 
 class Label(BaseUI):
@@ -89,12 +143,16 @@ class Label(BaseUI):
     def update(self, events):
         pass
 
-    def draw(self, surf):
-        pygame.draw.rect(surf, self.color, (self.x, self.y, self.w, self.h))
-        surf.blit(self.text, self.text.get_rect(center=self.rect.center))
+    def render(self):
+        surf = pygame.Surface((self.w, self.h), pygame.SRCALPHA)
+        draw_rect(surf, self.color, (0, 0, self.w, self.h))
+        surf.blit(self.text, self.text.get_rect(center=(self.w // 2, self.h // 2)))
+        return surf
 
 
 class InputBox(BaseUI):
+    focusable = True
+
     def __init__(self, x=0, y=0, w=100, h=50, default='Type Here', initial_string='', label='none', extendable=True, numeric_only=False):
         super().__init__(x, y)
         self.w = w
@@ -111,53 +169,52 @@ class InputBox(BaseUI):
         self.text = initial_string
         self.allowed_input = 'abcdefghijklmnopqrstuvwxyz1234567890' if not self.numeric_only else '1234567890'
         self.cursor_visible = True
-        self.cursor_blink_timer = time.time()
+        self.cursor_blink_timer = get_time()
 
-    def update(self, events):
-        mx, my = pygame.mouse.get_pos()
-        if self.rect.collidepoint(mx, my):
-            self.is_hovered = True
-        else:
-            self.is_hovered = False
-        for e in events:
-            if e.type == pygame.MOUSEBUTTONDOWN:
-                if e.button == 1:
-                    if self.is_hovered:
-                        self.is_active = True
-                    else:
-                        self.is_active = False
-            if e.type == pygame.KEYDOWN:
-                if self.is_active:
-                    if e.key == pygame.K_BACKSPACE:
-                        self.text = self.text[:-1]
-                    if not len(self.text) > self.w // 15 - 3:
-                        if e.key == pygame.K_SPACE:
-                            self.text += ' '
-                        # elif e.key != pygame.KMOD_SHIFT and chr(e.key) in self.allowed_input:
-                        #     self.text += chr(e.key).upper()
-            if e.type == pygame.TEXTINPUT:
-                if self.is_active:
-                    if e.text.lower() in self.allowed_input:
-                        if not len(self.text) > self.w // 15 - 3:
-                            self.text += e.text
+    def set_hovered(self, hovered):
+        self.is_hovered = hovered
 
-    def draw(self, surf):
-        color = self.active_color if self.is_hovered or self.is_active else self.inactive_color
-        if self.is_active:
-            display_text = self.text
-        else:
-            display_text = self.text if self.text != '' else self.default
-        if self.is_active:
-            if time.time() - self.cursor_blink_timer > 0.5:
-                self.cursor_blink_timer = time.time()
-                self.cursor_visible = not self.cursor_visible
-            if self.cursor_visible:
-                display_text += '_'
-            else:
-                display_text += ' '
+    def set_focused(self, focused):
+        self.is_active = focused
+
+    def handle_input(self, input_state):
+        if not self.is_active:
+            return
+        for key in input_state.downs:
+            if key == pygame.K_BACKSPACE:
+                self.text = self.text[:-1]
+            if not len(self.text) > self.w // 15 - 3:
+                if key == pygame.K_SPACE:
+                    self.text += ' '
+                # elif key != pygame.KMOD_SHIFT and chr(key) in self.allowed_input:
+                #     self.text += chr(key).upper()
+        for char in input_state.text:
+            if char.lower() in self.allowed_input:
+                if not len(self.text) > self.w // 15 - 3:
+                    self.text += char
+
+    def tick(self):
+        if self.is_active and get_time() - self.cursor_blink_timer > 0.5:
+            self.cursor_blink_timer = get_time()
+            self.cursor_visible = not self.cursor_visible
+
+    @property
+    def display_text(self):
+        if not self.is_active:
+            return self.text if self.text != '' else self.default
+        return self.text + ('_' if self.cursor_visible else ' ')
+
+    def state(self):
+        return self.display_text, self.is_hovered or self.is_active
+
+    def render(self):
+        display_text, highlighted = self.state()
+        color = self.active_color if highlighted else self.inactive_color
         t = text(display_text, 25, aliased=True)
-        pygame.draw.rect(surf, color, self.rect)
-        surf.blit(t, t.get_rect(center=self.rect.center))
+        surf = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        draw_rect(surf, color, surf.get_rect())
+        surf.blit(t, t.get_rect(center=surf.get_rect().center))
+        return surf
 
 
 class Link:
@@ -181,11 +238,15 @@ class Text(BaseUI):
         super().__init__(x, y)
         self.text = text(_text, size)
 
+    @property
+    def rect(self):
+        return self.text.get_rect(center=(self.x, self.y))
+
     def update(self, events):
         pass
 
-    def draw(self, surf):
-        surf.blit(self.text, self.text.get_rect(center=(self.x, self.y)))
+    def render(self):
+        return self.text
 
 
 class LinkUI(BaseUI):
@@ -200,20 +261,97 @@ class LinkUI(BaseUI):
     def rect(self):
         return self.text_ic.get_rect(center=(self.x, self.y))
 
-    def update(self, events):
-        self.active = False
-        mx, my = pygame.mouse.get_pos()
-        if self.rect.collidepoint(mx, my):
-            self.active = True
-        for e in events:
-            if e.type == pygame.MOUSEBUTTONDOWN:
-                if e.button == 1:
-                    if self.active:
-                        self.link.on_click()
+    def set_hovered(self, hovered):
+        self.active = hovered
+
+    def click(self):
+        self.link.on_click()
+
+    def state(self):
+        return self.active
+
+    def render(self):
+        return self.text_ac if self.active else self.text_ic
+
+
+class UIContainer:
+    """
+    Routes the input snapshot to its widgets and composes them onto a cached layer
+
+    Widgets are hit-tested against a rect index built when widgets are added or moved
+    (call reindex after moving one), hover only changes when the mouse moves.
+    The layer covers the union of the widget rects and is recomposed only when the cached
+    surface of a widget was redrawn, otherwise drawing is a single blit
+    """
+
+    def __init__(self, widgets: list[BaseUI] = ()):
+        self.widgets: list[BaseUI] = []
+        self._rects: list[pygame.Rect] = []  # hit-test index, parallel to widgets
+        self._versions: list[int] = []  # widget versions the layer was composed from
+        self.layer = None
+        self.layer_rect = pygame.Rect(0, 0, 0, 0)
+        self.hovered: Union[BaseUI, None] = None
+        self.focused: Union[BaseUI, None] = None
+        self.compositions = 0
+        for i in widgets:
+            self.add(i)
+
+    def add(self, widget: BaseUI):
+        self.widgets.append(widget)
+        self.reindex()
+
+    def remove(self, widget: BaseUI):
+        self.widgets.remove(widget)
+        if self.hovered is widget:
+            self.hovered = None
+        if self.focused is widget:
+            self.focused = None
+        self.reindex()
+
+    def reindex(self):
+        self._rects = [pygame.Rect(i.rect) for i in self.widgets]
+        self.layer_rect = self._rects[0].unionall(self._rects[1:]) if self._rects else pygame.Rect(0, 0, 0, 0)
+        self._versions = []
+        self.layer = None
+
+    def hit_test(self, pos) -> Union[BaseUI, None]:
+        # topmost widget at pos, widgets added later are drawn on top
+        hits = pygame.Rect(pos, (1, 1)).collidelistall(self._rects)
+        return self.widgets[hits[-1]] if hits else None
+
+    def update(self, input_state=INPUT):
+        if input_state.mouse_moved:
+            hovered = self.hit_test(input_state.mouse_pos)
+            if hovered is not self.hovered:
+                if self.hovered is not None:
+                    self.hovered.set_hovered(False)
+                if hovered is not None:
+                    hovered.set_hovered(True)
+                self.hovered = hovered
+        for pos in input_state.clicks:
+            widget = self.hit_test(pos)
+            focused = widget if widget is not None and widget.focusable else None
+            if focused is not self.focused:
+                if self.focused is not None:
+                    self.focused.set_focused(False)
+                if focused is not None:
+                    focused.set_focused(True)
+                self.focused = focused
+            if widget is not None:
+                widget.click()
+        if self.focused is not None:
+            self.focused.handle_input(input_state)
+            self.focused.tick()
 
     def draw(self, surf):
-        if self.active:
-            surf.blit(self.text_ac, self.text_ac.get_rect(center=(self.x, self.y)))
-        else:
-            surf.blit(self.text_ic, self.text_ic.get_rect(center=(self.x, self.y)))
-
+        surfaces = [i.surface for i in self.widgets]
+        versions = [i.version for i in self.widgets]
+        if self.layer is None or versions != self._versions:
+            # a new layer each time, so one already handed to the render thread is never changed
+            layer = pygame.Surface(self.layer_rect.size, pygame.SRCALPHA)
+            left, top = self.layer_rect.topleft
+            layer.blits([(image, rect.move(-left, -top)) for image, rect in zip(surfaces, self._rects)], doreturn=False)
+            self.layer = layer
+            self._versions = versions
+            self.compositions += 1
+        surf.blit(self.layer, self.layer_rect)
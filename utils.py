@@ -7,8 +7,11 @@ from config import *
 
 import pygame
 
+from animation import ANIMATIONS
+from asset_cache import get_cache, make_key
+from render import draw_image
+
 FONT = os.path.join(ASSETS, 'fonts', 'font.ttf')
-print(FONT)
 
 get_path = os.path.join
 
@@ -31,17 +34,55 @@ def distance(p1, p2):
     return math.sqrt((p2[0] - p1[0]) ** 2 + (p2[1] - p1[1]) ** 2)
 
 
+@lru_cache(maxsize=360)
+def direction_vector(angle):
+    """Unit vector pointing along angle (in degrees, y axis pointing down)"""
+    rad = math.radians(angle)
+    return math.cos(rad), -math.sin(rad)
+
+
+@lru_cache(maxsize=None)
+def get_numpy():
+    """numpy if it is installed else None, imported on first use to keep it off the startup path"""
+    try:
+        import numpy
+        return numpy
+    except ImportError:
+        return None
+
+
 def map_to_range(value, from_x, from_y, to_x, to_y):
     """map the value from one range to another"""
     return clamp(value * (to_y - to_x) / (from_y - from_x), to_x, to_y)
 
 
+def bake_alpha(img: pygame.Surface):
+    """Copy of img with its color key turned into per pixel alpha"""
+    baked = pygame.Surface(img.get_size(), pygame.SRCALPHA)
+    baked.blit(img, (0, 0))
+    return baked
+
+
 # @lru_cache()
 def load_image(path: str, alpha: bool = True, scale=1.0, color_key=None):
-    img = pygame.image.load(path)
-    img = pygame.transform.scale_by(img, scale)
-    if color_key:
+    cache = get_cache()
+    key = make_key(path, 'image', scale, color_key, alpha)
+    img = cache.get(key, path) if cache is not None else None
+    if img is None:
+        img = pygame.image.load(path)
+        img = pygame.transform.scale_by(img, scale)
+        if color_key:
+            img.set_colorkey(color_key)
+        if cache is not None:
+            if alpha:
+                cache.put(key, path, bake_alpha(img), 'RGBA')
+            else:
+                cache.put(key, path, img, 'RGB')
+    elif color_key and not alpha:
         img.set_colorkey(color_key)
+    if pygame.display.get_surface() is None:
+        # no display mode (e.g. the renderer backend draws to a Window), nothing to convert to
+        return img
     if alpha:
         return img.convert_alpha()
     else:
@@ -60,36 +101,49 @@ def text(msg: str, size=50, color=(255, 255, 255), aliased=False):
     return font(size).render(str(msg).upper(), aliased, color)
 
 
+# time source used by all timers, replaced by a simulated clock when running headless
+_time_source = time.time
+
+
+def get_time():
+    return _time_source()
+
+
+def set_time_source(source=None):
+    global _time_source
+    _time_source = source if source is not None else time.time
+
+
 class Timer:
     def __init__(self, timeout=0.0, reset=True):
         self.timeout = timeout
-        self.timer = time.time()
-        self.paused_timer = time.time()
+        self.timer = get_time()
+        self.paused_timer = get_time()
         self.paused = False
         self._reset = reset
 
     def reset(self):
-        self.timer = time.time()
+        self.timer = get_time()
 
     def pause(self):
         self.paused = True
-        self.paused_timer = time.time()
+        self.paused_timer = get_time()
 
     def resume(self):
         self.paused = False
-        self.timer -= time.time() - self.paused_timer
+        self.timer -= get_time() - self.paused_timer
 
     @property
     def elapsed(self):
         if self.paused:
-            return time.time() - self.timer - (time.time() - self.paused_timer)
-        return time.time() - self.timer
+            return get_time() - self.timer - (get_time() - self.paused_timer)
+        return get_time() - self.timer
 
     @property
     def tick(self):
         if self.elapsed > self.timeout:
             if self._reset:
-                self.timer = time.time()  # reset timer
+                self.timer = get_time()  # reset timer
             return True
         else:
             return False
@@ -101,9 +155,8 @@ class SpriteSheet:
     """
 
     def __init__(self, sheet, rows, cols, images=None, alpha=True, scale=1.0, color_key=None):
-        self._sheet = pygame.image.load(sheet)
-        if color_key:
-            self._sheet.set_colorkey(color_key)
+        self._path = sheet
+        self._sheet_surf = None  # decoded lazily, not needed when the frames are cached
         self._r = rows
         self._c = cols
         self._images = images if images else rows * cols
@@ -114,14 +167,40 @@ class SpriteSheet:
     def __str__(self):
         return f'SpriteSheet Object <{self._sheet.__str__()}>'
 
+    @property
+    def _sheet(self):
+        if self._sheet_surf is None:
+            self._sheet_surf = pygame.image.load(self._path)
+            if self._color_key:
+                self._sheet_surf.set_colorkey(self._color_key)
+        return self._sheet_surf
+
     def get_images(self):
+        cache = get_cache()
+        if cache is None:
+            return self._load_images()
+        keys = [make_key(self._path, 'sheet', self._r, self._c, self._images, self._scale, self._color_key, self._alpha, i)
+                for i in range(self._images)]
+        images = [cache.get(key, self._path) for key in keys]
+        if all(i is not None for i in images):
+            if pygame.display.get_surface() is not None:
+                images = [i.convert_alpha() for i in images]
+            return images
+        images = self._load_images()
+        for key, image in zip(keys, images):
+            cache.put(key, self._path, bake_alpha(image), 'RGBA')
+        return images
+
+    def _load_images(self):
         w = self._sheet.get_width() // self._c
         h = self._sheet.get_height() // self._r
         images = [self._sheet.subsurface(pygame.Rect(i % self._c * w, i // self._c * h, w, h)) for i in range(self._r * self._c)][0:self._images]
         if self._color_key is not None:
             for i in images:
                 i.set_colorkey(self._color_key)
-        if self._alpha:
+        if pygame.display.get_surface() is None:
+            pass
+        elif self._alpha:
             for i in images:
                 i.convert_alpha()
         else:
@@ -133,27 +212,35 @@ class SpriteSheet:
 
 
 class LoopingSpriteSheet:
+    """
+    Looping animation driven by the shared animation clock,
+    phase offsets the frame index so sprites of the same sheet don't all move in sync
+    """
+
     def __init__(self, sheet, rows, cols, images=None, alpha=True, scale=1.0, color_key=None, timer=0.1,
-                 mode: Literal['center', 'topleft'] = 'center'):
-        self.timer = Timer(timeout=timer)
+                 mode: Literal['center', 'topleft'] = 'center', phase=0):
         self.images = SpriteSheet(sheet, rows, cols, images, alpha, scale, color_key).get_images()
-        self.c = 0
+        self.frame_duration = timer
+        self.phase = phase
         self.mode = mode
 
+    @classmethod
+    def from_frames(cls, images: list[pygame.Surface], timer=0.1, mode: Literal['center', 'topleft'] = 'center', phase=0):
+        # build from frames that are already loaded, e.g. atlas subsurfaces
+        sheet = cls.__new__(cls)
+        sheet.images = list(images)
+        sheet.frame_duration = timer
+        sheet.phase = phase
+        sheet.mode = mode
+        return sheet
+
+    @property
+    def c(self):
+        return ANIMATIONS.index(len(self.images), self.frame_duration, self.phase)
+
     @property
     def image(self):
         return self.images[self.c]
 
     def draw(self, surf: pygame.Surface, x, y, angle=0, size=1):
-        if self.timer.tick:
-            self.c += 1
-            self.c %= len(self.images)
-        img = self.image
-        if size != 1:
-            img = pygame.transform.scale_by(img, size)
-        if angle != 0:
-            img = pygame.transform.rotate(img, angle)
-        if self.mode == 'center':
-            surf.blit(img, img.get_rect(center=(x, y)))
-        else:
-            surf.blit(img, (x, y))
+        draw_image(surf, self.image, x, y, angle, size, self.mode)